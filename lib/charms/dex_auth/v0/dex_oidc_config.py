@@ -96,10 +96,10 @@ The data shared by this library is:
 * issuer-url: the canonical URL for the issuer, OIDC cliets use this to refer to Dex
 """
 import logging
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from ops.charm import CharmBase, RelationEvent
-from ops.framework import BoundEvent, EventSource, Object, ObjectEvents
+from ops.framework import BoundEvent, EventSource, Handle, Object, ObjectEvents, StoredState
 from ops.model import Relation
 from pydantic import BaseModel
 
@@ -111,7 +111,11 @@ LIBAPI = 0
 
 # Increment this PATCH version before using `charmcraft publish-lib` or reset
 # to 0 if you are raising the major API version
-LIBPATCH = 1
+# NOTE: this copy is an unpublished local fork of upstream LIBPATCH 1. Patch 2
+# has not been published, and upstream's own patch 2 will have different
+# content. Do not run `charmcraft fetch-lib charms.dex_auth.v0.dex_oidc_config` over this
+# file until these changes have been upstreamed.
+LIBPATCH = 2
 
 # Default relation and interface names. If changed, consistency must be kept
 # across the provider and requirer.
@@ -145,7 +149,37 @@ class DexOidcConfigRelationDataMissingError(DexOidcConfigRelationError):
 
 
 class DexOidcConfigUpdatedEvent(RelationEvent):
-    """Indicates the Dex OIDC config data was updated."""
+    """Indicates the Dex OIDC config data was updated.
+
+    Attributes:
+        old_data (dict): the provider data before the update, empty if there was none
+        new_data (dict): the provider data after the update, empty if the relation was removed
+    """
+
+    def __init__(
+        self,
+        handle: Handle,
+        relation: Relation,
+        app=None,
+        unit=None,
+        old_data: Optional[Dict[str, str]] = None,
+        new_data: Optional[Dict[str, str]] = None,
+    ):
+        super().__init__(handle, relation, app, unit)
+        self.old_data = old_data or {}
+        self.new_data = new_data or {}
+
+    def snapshot(self) -> dict:
+        """Save the event, including the old and new data."""
+        snapshot = super().snapshot()
+        snapshot.update({"old_data": self.old_data, "new_data": self.new_data})
+        return snapshot
+
+    def restore(self, snapshot: dict) -> None:
+        """Restore the event, including the old and new data."""
+        super().restore(snapshot)
+        self.old_data = snapshot.get("old_data", {})
+        self.new_data = snapshot.get("new_data", {})
 
 
 class DexOidcConfigEvents(ObjectEvents):
@@ -168,7 +202,8 @@ class DexOidcConfigRequirer(Object):
     """Implement the Requirer end of the Dex OIDC config relation.
 
     This library emits:
-    * DexOidcConfigUpdatedEvent: when data received on the relation is updated.
+    * DexOidcConfigUpdatedEvent: when data received on the relation is updated, i.e. when it
+      differs from the data last seen by this unit, or when the relation is broken.
 
     Args:
         charm (CharmBase): the provider application
@@ -182,6 +217,7 @@ class DexOidcConfigRequirer(Object):
     """
 
     on = DexOidcConfigEvents()
+    _stored = StoredState()
 
     def __init__(
         self,
@@ -193,6 +229,7 @@ class DexOidcConfigRequirer(Object):
         self._charm = charm
         self._relation_name = relation_name
         self._requirer_wrapper = DexOidcConfigRequirerWrapper(self._charm, self._relation_name)
+        self._stored.set_default(data={})
 
         self.framework.observe(
             self._charm.on[self._relation_name].relation_changed, self._on_relation_changed
@@ -211,12 +248,28 @@ class DexOidcConfigRequirer(Object):
         return self._requirer_wrapper.get_data()
 
     def _on_relation_changed(self, event: BoundEvent) -> None:
-        """Handle relation-changed event for this relation."""
-        self.on.updated.emit(event.relation)
+        """Handle relation-changed event for this relation.
+
+        Emit the updated event only if the provider data differs from the data last seen.
+        """
+        relation = self.model.get_relation(self._relation_name)
+        if not relation or not relation.app:
+            return
+
+        old_data = dict(self._stored.data)
+        new_data = dict(relation.data[relation.app])
+        if new_data == old_data:
+            logger.debug("Dex OIDC config unchanged, not emitting the updated event.")
+            return
+
+        self._stored.data = new_data
+        self.on.updated.emit(relation, old_data=old_data, new_data=new_data)
 
     def _on_relation_broken(self, event: BoundEvent) -> None:
         """Handle relation-broken event for this relation."""
-        self.on.updated.emit(event.relation)
+        old_data = dict(self._stored.data)
+        self._stored.data = {}
+        self.on.updated.emit(event.relation, old_data=old_data, new_data={})
 
 
 class DexOidcConfigRequirerWrapper(Object):
@@ -233,6 +286,8 @@ class DexOidcConfigRequirerWrapper(Object):
     def __init__(self, charm, relation_name: Optional[str] = DEFAULT_RELATION_NAME):
         super().__init__(charm, relation_name)
         self.relation_name = relation_name
+        # Relation id and data of the last object returned by get_data, and the object itself
+        self._data_cache: Optional[Tuple[int, Dict[str, str], DexOidcConfigObject]] = None
 
     @staticmethod
     def _validate_relation(relation: Optional[Relation]) -> None:
@@ -277,9 +332,15 @@ class DexOidcConfigRequirerWrapper(Object):
         self._validate_relation(relation=relation)
 
         # Get relation data from remote app
-        relation_data = relation.data[relation.app]
+        relation_data = dict(relation.data[relation.app])
+
+        # Return the cached object if the data did not change since the last call
+        if self._data_cache and self._data_cache[:2] == (relation.id, relation_data):
+            return self._data_cache[2]
 
-        return DexOidcConfigObject(issuer_url=relation_data["issuer-url"])
+        data = DexOidcConfigObject(issuer_url=relation_data["issuer-url"])
+        self._data_cache = (relation.id, relation_data, data)
+        return data
 
 
 class DexOidcConfigProvider(Object):
@@ -142,12 +142,15 @@ for policy in self._mesh.mesh_info():
 - **CMRData**: Contains cross-model relation metadata
 """
 
+import copy
 import enum
 import hashlib
 import json
 import logging
+import time
 import warnings
-from typing import Dict, List, Literal, Optional, Set, Type, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Literal, Optional, Set, Tuple, Type, Union
 
 import httpx
 import pydantic
@@ -161,17 +164,18 @@ from charmed_service_mesh_helpers.models import (
     To,
     WorkloadSelector,
 )
-from lightkube import Client
+from lightkube import ApiError, Client
 from lightkube.models.meta_v1 import ObjectMeta
 from lightkube.resources.apps_v1 import StatefulSet
 from lightkube.resources.core_v1 import ConfigMap, Service
-from lightkube_extensions.batch import KubernetesResourceManager
+from lightkube.types import PatchType
+from lightkube_extensions.batch import KubernetesResourceManager, delete_many, patch_many
 from lightkube_extensions.types import (
     AuthorizationPolicy,
     LightkubeResourcesList,
     LightkubeResourceTypesSet,
 )
-from ops import CharmBase, Object, RelationMapping
+from ops import CharmBase, Object, RelationMapping, StoredState
 from pydantic import Field
 
 POLICY_RESOURCE_TYPES = {
@@ -180,7 +184,11 @@ POLICY_RESOURCE_TYPES = {
 
 LIBID = "3f40cb7e3569454a92ac2541c5ca0a0c"  # Never change this
 LIBAPI = 0
-LIBPATCH = 16
+# NOTE: this copy is an unpublished local fork of upstream LIBPATCH 16. Patch 17
+# has not been published, and upstream's own patch 17 will have different
+# content. Do not run `charmcraft fetch-lib charms.istio_beacon_k8s.v0.service_mesh` over this
+# file until these changes have been upstreamed.
+LIBPATCH = 17
 
 PYDEPS = [
     "lightkube",
@@ -195,6 +203,9 @@ logger = logging.getLogger(__name__)
 # Kubernetes's 253 character limit.
 label_configmap_name_template = "juju-service-mesh-{app_name}-labels"
 
+# HTTP status codes for which a concurrent policy apply is retried
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
 
 class MeshType(str, enum.Enum):
     """Supported mesh types."""
@@ -337,6 +348,8 @@ class CMRData(pydantic.BaseModel):
 class ServiceMeshConsumer(Object):
     """Class used for joining a service mesh."""
 
+    _stored = StoredState()
+
     def __init__(
         self,
         charm: CharmBase,
@@ -345,6 +358,7 @@ class ServiceMeshConsumer(Object):
         cross_model_mesh_provides_name: str = "provide-cmr-mesh",
         policies: Optional[List[Union[Policy, AppPolicy, UnitPolicy]]] = None,
         auto_join: bool = True,
+        lightkube_client: Optional[Client] = None,
     ):
         """Class used for joining a service mesh.
 
@@ -358,6 +372,9 @@ class ServiceMeshConsumer(Object):
                 charmcraft.yaml for the relation which provides the cross_model_mesh interface.
             policies: List of access policies this charm supports.
             auto_join: Automatically join the mesh by applying labels to charm pods.
+            lightkube_client: Optional lightkube Client to use for Kubernetes calls, so that it can
+                be shared with the rest of the charm.  It must be created with a namespace and
+                field_manager.  If omitted, a Client is created on first use.
         """
         super().__init__(charm, mesh_relation_name)
         self._charm = charm
@@ -365,7 +382,14 @@ class ServiceMeshConsumer(Object):
         self._cmr_relations = self._charm.model.relations[cross_model_mesh_provides_name]
         self._policies = policies or []
         self._label_configmap_name = label_configmap_name_template.format(app_name=self._charm.app.name)
-        self._lightkube_client = None
+        self._lightkube_client = lightkube_client
+        # Validated CMRData keyed by the raw `cmr_data` string, so that unchanged cross-model
+        # relations are not re-parsed on every dispatch.
+        self._stored.set_default(cmr_data_cache={})
+        # (raw databag items, parsed app data, validation error) for the remote mesh provider
+        self._app_data_cache: Optional[
+            Tuple[Tuple[Tuple[str, str], ...], Optional[ServiceMeshProviderAppData], Optional[str]]
+        ] = None
         if auto_join:
             self.framework.observe(
                 self._charm.on[mesh_relation_name].relation_changed, self._update_labels
@@ -417,22 +441,41 @@ class ServiceMeshConsumer(Object):
             return
         logger.debug("Updating service mesh policies.")
 
-        # Collect the remote data from any fully established cross_model_relation integrations
-        # {remote application name: cmr relation data}
-        cmr_application_data = {
-            cmr.app.name: CMRData.model_validate(json.loads(cmr.data[cmr.app]["cmr_data"]))
-            for cmr in self._cmr_relations if "cmr_data" in cmr.data[cmr.app]
-        }
-
         mesh_policies = build_mesh_policies(
             relation_mapping=self._charm.model.relations,
             target_app_name=self._charm.app.name,
             target_namespace=self._my_namespace(),
             policies=self._policies,
-            cmr_application_data=cmr_application_data,
+            cmr_application_data=self._get_cmr_application_data(),
         )
         self._relation.data[self._charm.app]["policies"] = json.dumps(mesh_policies)
 
+    def _get_cmr_application_data(self) -> Dict[str, CMRData]:
+        """Return the remote data from any fully established cross_model_relation integrations.
+
+        The result maps the remote application name to its CMRData.  Validated CMRData is cached
+        in StoredState keyed by the raw `cmr_data` string, so only new or changed cross-model
+        relations are parsed and validated.  Cache entries for raw strings that are no longer
+        present on any relation are dropped.
+        """
+        cache = self._stored.cmr_data_cache
+        seen = {}
+        cmr_application_data = {}
+        for cmr in self._cmr_relations:
+            raw = cmr.data[cmr.app].get("cmr_data")
+            if raw is None:
+                continue
+            cached = cache.get(raw)
+            if cached is None:
+                cached = CMRData.model_validate(json.loads(raw)).model_dump()
+            seen[raw] = dict(cached)
+            # The cached data was validated when it was stored, so skip validation here
+            cmr_application_data[cmr.app.name] = CMRData.model_construct(**cached)
+
+        if seen.keys() != set(cache.keys()):
+            self._stored.cmr_data_cache = seen
+        return cmr_application_data
+
     def _my_namespace(self):
         """Return the namespace of the running charm."""
         # This method currently assumes the namespace is the same as the model name. We
@@ -440,17 +483,46 @@ class ServiceMeshConsumer(Object):
         return self._charm.model.name
 
     def _get_app_data(self) -> Optional[ServiceMeshProviderAppData]:
-        """Return the relation data for the remote application."""
+        """Return the relation data for the remote application.
+
+        The databag is parsed and validated only when its raw contents differ from the last call,
+        so every accessor shares a single parse per dispatch.  Invalid data is logged once and
+        recorded for `provider_app_data_error` instead of raising on each access.
+        """
         if self._relation is None or not self._relation.app:
+            self._app_data_cache = None
             return None
 
-        raw_data = self._relation.data[self._relation.app]
-        if len(raw_data) == 0:
-            return None
+        raw_data = tuple(sorted(self._relation.data[self._relation.app].items()))
+        if self._app_data_cache is not None and self._app_data_cache[0] == raw_data:
+            return self._app_data_cache[1]
 
-        raw_data = {k: json.loads(v) for k, v in raw_data.items()}
-        return ServiceMeshProviderAppData.model_validate(raw_data)
+        app_data, error = None, None
+        if raw_data:
+            try:
+                app_data = ServiceMeshProviderAppData.model_validate(
+                    {k: json.loads(v) for k, v in raw_data}
+                )
+            except (json.JSONDecodeError, pydantic.ValidationError) as e:
+                error = f"Invalid data in the {self._relation.name} relation: {e}"
+                logger.error(error)
+        self._app_data_cache = (raw_data, app_data, error)
+        return app_data
 
+    def provider_app_data(self) -> Optional[ServiceMeshProviderAppData]:
+        """Return all the data published by the service mesh provider, or None if unavailable.
+
+        Use this instead of calling `labels()` and `mesh_type()` separately when more than one
+        field is needed.
+        """
+        return self._get_app_data()
+
+    def provider_app_data_error(self) -> Optional[str]:
+        """Return the validation error for the service mesh provider data, if it is invalid."""
+        self._get_app_data()
+        if self._app_data_cache is None:
+            return None
+        return self._app_data_cache[2]
 
     def labels(self) -> dict:
         """Labels required for a pod to join the mesh."""
@@ -473,6 +545,9 @@ class ServiceMeshConsumer(Object):
         self._delete_label_configmap()
 
     def _update_labels(self, _event):
+        if self.provider_app_data_error():
+            # Keep the current labels rather than dropping the charm off the mesh on bad data
+            return
         self._set_labels(self.labels())
 
     def _set_labels(self, labels: dict) -> None:
@@ -576,51 +651,112 @@ def build_mesh_policies(
         target_namespace: The namespace of the target application, for example self.model.name.
         policies: List of AppPolicy, or UnitPolicy objects defining the access rules.
         cmr_application_data: Data for cross-model relations, mapping app names to CMRData.
+
+    Returns:
+        The dumped MeshPolicy of every (policy, related application) pair. Each one is a separate
+        copy, so it can be modified without affecting the others.
     """
+    relation_sources = _build_relation_sources_index(
+        relation_mapping=relation_mapping,
+        relation_names=(policy.relation for policy in policies),
+        target_namespace=target_namespace,
+        cmr_application_data=cmr_application_data,
+    )
+
     mesh_policies = []
     for policy in policies:
-        for relation in relation_mapping[policy.relation]:
-            if relation.app.name in cmr_application_data:
+        sources = relation_sources[policy.relation]
+        if not sources:
+            continue
+        # Only the source fields differ between the relations of a policy, so the MeshPolicy is
+        # validated and dumped once and then stamped out per related application.
+        template = _build_mesh_policy_template(policy, target_app_name, target_namespace)
+        mesh_policies.extend(
+            {
+                **template,
+                "source_namespace": source_namespace,
+                "source_app_name": source_app_name,
+                "endpoints": _copy_endpoints(template["endpoints"]),
+            }
+            for source_app_name, source_namespace in sources
+        )
+
+    return mesh_policies
+
+
+def _build_mesh_policy_template(
+        policy: Union[Policy, AppPolicy, UnitPolicy],
+        target_app_name: str,
+        target_namespace: str,
+) -> dict:
+    """Return the dumped MeshPolicy for a policy, with placeholder source fields.
+
+    The returned dict is validated exactly as a MeshPolicy built for a real relation would be, as
+    the source fields take no part in MeshPolicy validation.  The nested `endpoints` data must be
+    copied with `_copy_endpoints` for every dict stamped out from this template.
+    """
+    if isinstance(policy, UnitPolicy):
+        mesh_policy = MeshPolicy(
+            source_namespace="",
+            source_app_name="",
+            target_namespace=target_namespace,
+            target_app_name=target_app_name,
+            target_service=None,
+            target_type=PolicyTargetType.unit,
+            endpoints=[
+                Endpoint(
+                    ports=policy.ports,
+                )
+            ]
+            if policy.ports
+            else [],
+        )
+    else:
+        mesh_policy = MeshPolicy(
+            source_namespace="",
+            source_app_name="",
+            target_namespace=target_namespace,
+            target_app_name=target_app_name,
+            target_service=policy.service,
+            target_type=PolicyTargetType.app,
+            endpoints=policy.endpoints,
+        )
+    return mesh_policy.model_dump()
+
+
+def _copy_endpoints(endpoints: List[dict]) -> List[dict]:
+    """Return a copy of dumped Endpoints, whose fields are all lists of scalars or None."""
+    return [
+        {field: list(value) if value is not None else None for field, value in endpoint.items()}
+        for endpoint in endpoints
+    ]
+
+
+def _build_relation_sources_index(
+        relation_mapping: RelationMapping,
+        relation_names: Iterable[str],
+        target_namespace: str,
+        cmr_application_data: Dict[str, CMRData],
+) -> Dict[str, List[Tuple[str, str]]]:
+    """Return the (source_app_name, source_namespace) pairs for every related app, per relation name.
+
+    Each relation name is walked only once, regardless of how many policies reference it.
+    """
+    index: Dict[str, List[Tuple[str, str]]] = {}
+    for relation_name in relation_names:
+        if relation_name in index:
+            continue
+        sources = []
+        for relation in relation_mapping[relation_name]:
+            cmr_data = cmr_application_data.get(relation.app.name)
+            if cmr_data is not None:
                 logger.debug(f"Found cross model relation: {relation.name}. Creating policy.")
-                source_app_name = cmr_application_data[relation.app.name].app_name
-                source_namespace = cmr_application_data[relation.app.name].juju_model_name
+                sources.append((cmr_data.app_name, cmr_data.juju_model_name))
             else:
                 logger.debug(f"Found in-model relation: {relation.name}. Creating policy.")
-                source_app_name = relation.app.name
-                source_namespace = target_namespace
-
-            if isinstance(policy, UnitPolicy):
-                mesh_policies.append(
-                    MeshPolicy(
-                        source_namespace=source_namespace,
-                        source_app_name=source_app_name,
-                        target_namespace=target_namespace,
-                        target_app_name=target_app_name,
-                        target_service=None,
-                        target_type=PolicyTargetType.unit,
-                        endpoints=[
-                            Endpoint(
-                                ports=policy.ports,
-                            )
-                        ]
-                        if policy.ports
-                        else [],
-                    ).model_dump()
-                )
-            else:
-               mesh_policies.append(
-                    MeshPolicy(
-                        source_namespace=source_namespace,
-                        source_app_name=source_app_name,
-                        target_namespace=target_namespace,
-                        target_app_name=target_app_name,
-                        target_service=policy.service,
-                        target_type=PolicyTargetType.app,
-                        endpoints=policy.endpoints,
-                    ).model_dump()
-                )
-
-    return mesh_policies
+                sources.append((relation.app.name, target_namespace))
+        index[relation_name] = sources
+    return index
 
 
 def reconcile_charm_labels(client: Client, app_name: str, namespace: str,  label_configmap_name: str, labels: Dict[str, str]) -> None:
@@ -719,19 +855,29 @@ def _get_peer_identity_for_service_account(service_account, namespace):
 def _hash_pydantic_model(model: pydantic.BaseModel) -> str:
     """Hash a pydantic BaseModel object.
 
-    This is a simple hashing of the json model dump of the pydantic model.  Items that are excluded from this dump
-    will not affect the output.
+    This hashes a canonical JSON serialization (sorted keys, no whitespace) of the model's json mode dump, so the
+    result depends only on the field values and not on how pydantic happens to render the model.  Items that are
+    excluded from this dump will not affect the output.
     """
+    canonical = json.dumps(model.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
 
-    def _stable_hash(data):
-        return hashlib.sha256(str(data).encode()).hexdigest()
 
-    # Note: This hash will be affected by changes in how pydantic stringifies data, so if they change things our hash
-    # will change too.  If that proves an issue, we could implement something more controlled here.
-    return _stable_hash(model)
+def _legacy_hash_pydantic_model(model: pydantic.BaseModel) -> str:
+    """Hash a pydantic BaseModel object the way policy names were hashed before the canonical JSON scheme.
 
+    This hashes pydantic's str() of the model, which depends on the installed pydantic version.  It is only used to
+    recognise and adopt policy resources that were created under the old naming scheme.
+    """
+    return hashlib.sha256(str(model).encode()).hexdigest()
 
-def _generate_network_policy_name(app_name: str, model_name: str, mesh_policy: MeshPolicy) -> str:
+
+def _generate_network_policy_name(
+        app_name: str,
+        model_name: str,
+        mesh_policy: MeshPolicy,
+        hasher: Callable[[pydantic.BaseModel], str] = _hash_pydantic_model,
+) -> str:
         """Generate a unique name for the network policy resource, suffixing a hash of the MeshPolicy to avoid collisions.
 
         The name has the following general format:
@@ -742,6 +888,7 @@ def _generate_network_policy_name(app_name: str, model_name: str, mesh_policy: M
         # omit target_app_namespace from the name here because that will be the namespace the policy is generated in, so
         # adding it here is redundant
         target = mesh_policy.target_app_name or mesh_policy.target_service or "custom-selector"
+        policy_hash = hasher(mesh_policy)[:8]
 
         name = "-".join(
             [
@@ -751,7 +898,7 @@ def _generate_network_policy_name(app_name: str, model_name: str, mesh_policy: M
                 mesh_policy.source_app_name,
                 mesh_policy.source_namespace,
                 target,
-                _hash_pydantic_model(mesh_policy)[:8],
+                policy_hash,
             ]
         )
         if len(name) > 253:
@@ -767,12 +914,17 @@ def _generate_network_policy_name(app_name: str, model_name: str, mesh_policy: M
                     mesh_policy.source_app_name[:30],
                     mesh_policy.source_namespace[:30],
                     target[:30],
-                    _hash_pydantic_model(mesh_policy)[:8],
+                    policy_hash,
                 ]
             )
         return name
 
 
+def _resource_key(resource) -> Tuple[Type, Optional[str], Optional[str]]:
+    """Return a key identifying a lightkube resource by its type, name and namespace."""
+    return type(resource), resource.metadata.name, resource.metadata.namespace
+
+
 def _build_policy_resources_istio(app_name: str, model_name: str, policies: List[MeshPolicy]) -> Union[LightkubeResourcesList, List[None]]:
         """Build the required authorization policy resources for istio service mesh."""
         authorization_policies = [None] * len(policies)
@@ -908,6 +1060,27 @@ def _build_policy_resources_istio(app_name: str, model_name: str, policies: List
         return authorization_policies
 
 
+class PolicyResourceConnectionError(Exception):
+    """Raised when the Kubernetes API could not be reached while reconciling policy resources.
+
+    Wraps the underlying httpx.TransportError, which is available as __cause__.
+    """
+
+
+class PolicyResourceApplyError(Exception):
+    """Raised when one or more policy resources failed to be applied concurrently.
+
+    Attributes:
+        errors: (resource name, exception) for every failed resource, in the order the resources
+                were given to the PolicyResourceManager.
+    """
+
+    def __init__(self, errors: List[Tuple[str, Exception]]):
+        self.errors = errors
+        details = "; ".join(f"{name}: {error}" for name, error in errors)
+        super().__init__(f"Failed to apply {len(errors)} policy resource(s): {details}")
+
+
 class PolicyResourceManager():
     """A Mesh agnostic policy resource manager that manages manifests of different policy manifests in Kubernetes.
 
@@ -1034,6 +1207,14 @@ class PolicyResourceManager():
         logger (logging.Logger): (Optional) A logger to use for logging (so that log messages
                                  emitted here will appear under the caller's log namespace).
                                  If not provided, a default logger will be created.
+        max_workers (int): (Optional) Number of policy resources to apply in parallel during
+                           reconcile. Defaults to 1, which applies them one at a time. With more
+                           than one worker, each apply is retried with exponential backoff on
+                           429 and 5xx responses and failures are raised together as a
+                           PolicyResourceApplyError once every apply has finished.
+        retry_attempts (int): (Optional) Number of attempts per resource when max_workers > 1.
+        retry_backoff (float): (Optional) Seconds to wait before the first retry, doubled on each
+                               following retry.
     """
     def __init__(
         self,
@@ -1041,9 +1222,15 @@ class PolicyResourceManager():
         lightkube_client: Client,
         labels: Optional[Dict] = None,
         logger: Optional[logging.Logger] = None,
+        max_workers: int = 1,
+        retry_attempts: int = 3,
+        retry_backoff: float = 0.5,
     ):
         self._app_name = charm.app.name
         self._model_name = charm.model.name
+        self._max_workers = max_workers
+        self._retry_attempts = retry_attempts
+        self._retry_backoff = retry_backoff
         resource_types = self._get_all_supported_policy_resource_types()
 
         if logger is None:
@@ -1140,7 +1327,133 @@ class PolicyResourceManager():
             self.delete(ignore_missing=ignore_missing)
             return
 
-        self._krm.reconcile(all_resources, force=force, ignore_missing=ignore_missing)
+        # List the deployed resources once, for both the legacy name adoption and the deletion
+        # of stale resources
+        existing_resources = self._krm.get_deployed_resources()
+        if policies:
+            self._adopt_legacy_policy_names(policies, all_resources, existing_resources)
+        self._reconcile_resources(
+            all_resources, existing_resources, force=force, ignore_missing=ignore_missing
+        )
+
+    def _adopt_legacy_policy_names(
+        self, policies: List[MeshPolicy], resources: List, existing_resources: List
+    ) -> None:
+        """Rename built resources to their pre-existing legacy name, if one is deployed.
+
+        Policy names used to be hashed from pydantic's str() of the MeshPolicy.  To avoid deleting and recreating
+        every policy on upgrade, a deployed resource named with the legacy hash is kept under that name for as long
+        as the policy it implements is unchanged.  `resources` must be the output of _build_policy_resources for
+        `policies`, and is updated in place.
+        """
+        existing_names = {resource.metadata.name for resource in existing_resources}
+        for policy, resource in zip(policies, resources):
+            if resource is None or resource.metadata.name in existing_names:
+                continue
+            legacy_name = _generate_network_policy_name(
+                self._app_name, self._model_name, policy, hasher=_legacy_hash_pydantic_model
+            )
+            if legacy_name in existing_names:
+                self.log.debug(f"Adopting policy {legacy_name} created under the legacy naming scheme")
+                resource.metadata.name = legacy_name
+
+    def _reconcile_resources(
+        self,
+        resources: List,
+        existing_resources: List,
+        force: bool,
+        ignore_missing: bool,
+    ) -> None:
+        """Reconcile like KubernetesResourceManager.reconcile, reusing the listed `existing_resources`.
+
+        Stale resources are deleted first, then every desired resource is applied.  With more than
+        one worker, the applies run through a bounded thread pool and all of them run to completion
+        before any failure is raised.
+
+        Raises:
+            ValueError: If a resource is not of a type managed by this PolicyResourceManager.
+            PolicyResourceConnectionError: If the Kubernetes API could not be reached.
+            PolicyResourceApplyError: If any resource failed to be applied concurrently.
+        """
+        # Unit policies with disallowed attributes are built as None, so skip them
+        resources = [resource for resource in resources if resource is not None]
+        unsupported_types = {type(resource) for resource in resources} - self._krm.resource_types
+        if unsupported_types:
+            raise ValueError(
+                f"Resource types {unsupported_types} not in allowed resource types"
+                f" '{self._krm.resource_types}'"
+            )
+
+        desired_keys = {_resource_key(resource) for resource in resources}
+        resources_to_delete = [
+            resource for resource in existing_resources
+            if _resource_key(resource) not in desired_keys
+        ]
+        try:
+            delete_many(self._krm.lightkube_client, resources_to_delete, ignore_missing, self.log)
+        except httpx.TransportError as e:
+            raise PolicyResourceConnectionError(
+                "Failed to delete Kubernetes resources: the Kubernetes API may be unreachable."
+                f" Cause: {e}"
+            ) from e
+
+        resources = copy.deepcopy(resources)
+        if self._krm.labels is not None:
+            for resource in resources:
+                resource.metadata.labels = {**(resource.metadata.labels or {}), **self._krm.labels}
+
+        if self._max_workers <= 1:
+            try:
+                patch_many(self._krm.lightkube_client, resources, force=force, logger=self.log)
+            except httpx.TransportError as e:
+                raise PolicyResourceConnectionError(
+                    "Failed to apply Kubernetes resources: the Kubernetes API may be unreachable."
+                    f" Cause: {e}"
+                ) from e
+            return
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = [
+                executor.submit(self._apply_with_retry, resource, force) for resource in resources
+            ]
+        errors = [
+            (resource.metadata.name, future.exception())
+            for resource, future in zip(resources, futures)
+            if future.exception() is not None
+        ]
+        if errors:
+            raise PolicyResourceApplyError(errors)
+
+    def _apply_with_retry(self, resource, force: bool) -> None:
+        """Server-side apply a single resource, retrying on 429 and 5xx responses."""
+        for attempt in range(self._retry_attempts):
+            try:
+                self._krm.lightkube_client.patch(
+                    res=type(resource),
+                    name=resource.metadata.name,
+                    obj=resource,
+                    namespace=resource.metadata.namespace,
+                    patch_type=PatchType.APPLY,
+                    force=force,
+                )
+                return
+            except ApiError as e:
+                if (
+                    e.status.code not in RETRYABLE_STATUS_CODES
+                    or attempt == self._retry_attempts - 1
+                ):
+                    raise
+                delay = self._retry_backoff * 2**attempt
+                self.log.warning(
+                    f"Applying {resource.metadata.name} failed with {e.status.code}, "
+                    f"retrying in {delay}s"
+                )
+                time.sleep(delay)
+            except httpx.TransportError as e:
+                raise PolicyResourceConnectionError(
+                    f"Failed to apply {resource.metadata.name}: the Kubernetes API may be"
+                    f" unreachable. Cause: {e}"
+                ) from e
 
     def delete(self, ignore_missing=True):
         """Delete all the policy resources handled by this manager.
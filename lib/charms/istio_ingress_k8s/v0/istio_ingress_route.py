@@ -136,10 +136,11 @@ class IstioIngressCharm(CharmBase):
 ```
 """
 
+import json
 import logging
 from abc import ABC
 from enum import Enum
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 from ops.charm import CharmBase, CharmEvents, RelationEvent
 from ops.framework import EventSource, Object, StoredState
@@ -155,7 +156,11 @@ LIBAPI = 0
 
 # Increment this PATCH version before using `charmcraft publish-lib` or reset
 # to 0 if you are raising the major API version
-LIBPATCH = 3
+# NOTE: this copy is an unpublished local fork of upstream LIBPATCH 3. Patch 4
+# has not been published, and upstream's own patch 4 will have different
+# content. Do not run `charmcraft fetch-lib charms.istio_ingress_k8s.v0.istio_ingress_route` over this
+# file until these changes have been upstreamed.
+LIBPATCH = 4
 
 log = logging.getLogger(__name__)
 
@@ -570,6 +575,15 @@ class IstioIngressRouteConfig(BaseModel):
     grpc_routes: List[GRPCRoute] = Field(default_factory=list)
 
 
+def serialize_config(config: IstioIngressRouteConfig) -> str:
+    """Serialize a config to canonical JSON, with sorted keys and no whitespace.
+
+    Equal configs always serialize to the same string, so the result can be cached by the charm
+    and compared against what is already in the relation databag.
+    """
+    return json.dumps(config.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+
+
 # -------------------------------------------------------------------
 # Events
 # -------------------------------------------------------------------
@@ -787,6 +801,8 @@ class IstioIngressRouteRequirer(Object):
 
         self._charm = charm
         self._relation_name = relation_name
+        # Whether the stored data was refreshed from the relations during this dispatch
+        self._refreshed = False
 
         self.framework.observe(
             self._charm.on[relation_name].relation_changed, self._on_relation_changed
@@ -808,32 +824,50 @@ class IstioIngressRouteRequirer(Object):
         return self._stored.tls_enabled or False  # type: ignore
 
     def _update_stored(self) -> None:
-        """Ensure that the stored host is up-to-date."""
-        if not self._charm.unit.is_leader():
+        """Ensure that the stored host is up-to-date.
+
+        The relations are read at most once per dispatch, or again after a relation event, and
+        StoredState is only written when a value actually changed.
+        """
+        if not self._charm.unit.is_leader() or self._refreshed:
             return
 
+        external_host, tls_enabled = self._read_remote_state()
+        self._set_stored(external_host, tls_enabled)
+        self._refreshed = True
+
+    def _read_remote_state(self) -> Tuple[str, bool]:
+        """Return the external host and TLS state published by istio-ingress."""
+        external_host = self._stored.external_host
+        tls_enabled = self._stored.tls_enabled
         for relation in self._charm.model.relations[self._relation_name]:
             if not relation.app:
-                self._stored.external_host = ""
-                self._stored.tls_enabled = False
-                return
-            external_host = relation.data[relation.app].get("external_host", "")
-            self._stored.external_host = (
-                external_host or self._stored.external_host  # pyright: ignore
+                return "", False
+            external_host = (
+                relation.data[relation.app].get("external_host", "") or external_host
             )
             tls_enabled_str = relation.data[relation.app].get("tls_enabled", "False")
-            self._stored.tls_enabled = tls_enabled_str == "True"
+            tls_enabled = tls_enabled_str == "True"
+        return external_host, tls_enabled  # type: ignore
+
+    def _set_stored(self, external_host: str, tls_enabled: bool) -> None:
+        """Update StoredState, leaving it untouched if nothing changed."""
+        if self._stored.external_host != external_host:
+            self._stored.external_host = external_host
+        if self._stored.tls_enabled != tls_enabled:
+            self._stored.tls_enabled = tls_enabled
 
     def _on_relation_changed(self, event: RelationEvent) -> None:
         """Update StoredState with external_host and other information from istio-ingress."""
+        self._refreshed = False
         self._update_stored()
         if self._charm.unit.is_leader():
             self.on.ready.emit(relation=event.relation, app=event.relation.app)
 
     def _on_relation_broken(self, event: RelationEvent) -> None:
         """On RelationBroken, clear the stored data if set and emit an event."""
-        self._stored.external_host = ""
-        self._stored.tls_enabled = False
+        self._set_stored("", False)
+        self._refreshed = False
         if self._charm.unit.is_leader():
             self.on.ready.emit(relation=event.relation, app=event.relation.app)
 
@@ -850,6 +884,20 @@ class IstioIngressRouteRequirer(Object):
         Args:
             config: The IstioIngressRouteConfig to submit.
 
+        Raises:
+            UnauthorizedError: If the unit is not the leader.
+        """
+        self.submit_serialized_config(serialize_config(config))
+
+    def submit_serialized_config(self, config_json: str):
+        """Submit an ingress configuration already serialized with `serialize_config`.
+
+        The relation databag is only written where its current config differs, so that
+        istio-ingress does not get a relation-changed event for an unchanged config.
+
+        Args:
+            config_json: The canonical JSON of the IstioIngressRouteConfig to submit.
+
         Raises:
             UnauthorizedError: If the unit is not the leader.
         """
@@ -863,5 +911,5 @@ class IstioIngressRouteRequirer(Object):
 
         for relation in relations:
             app_databag = relation.data[self._charm.app]
-            # Serialize to JSON using Pydantic v2
-            app_databag["config"] = config.model_dump_json()
+            if app_databag.get("config") != config_json:
+                app_databag["config"] = config_json
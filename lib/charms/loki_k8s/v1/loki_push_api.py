@@ -400,6 +400,18 @@ Once the LogForwader class is implemented in your charm and the relation (implem
 each workload container the charm has access to, to configure Pebble's log forwarding
 feature and start sending logs to Loki.
 
+To reduce the volume of logs sent to Loki, the logs of only some of the Pebble services can be
+forwarded with `services`, and `labels` adds custom labels to every forwarded log line, on top
+of the Juju topology labels (which cannot be overridden):
+
+```python
+      self._log_forwarder = LogForwarder(
+          self,
+          services=["my-service"],  # optional, defaults to all the services
+          labels={"team": "auth"},  # optional
+      )
+```
+
 ## Alerting Rules
 
 This charm library also supports gathering alerting rules from all related Loki client
@@ -473,6 +485,22 @@ class LokiClientCharm(CharmBase):
         self.unit.status = BlockedStatus(event.message)
 ```
 
+### Precompiled alert rules
+
+Reading the alert rules directory means parsing every rule file. As the rule files do not change
+after the charm is built, they can be read once at build time instead, with
+`build_alert_rules_bundle`, for instance in the `override-build` of a `charmcraft.yaml` part:
+
+```shell
+python3 -c "from charms.loki_k8s.v1.loki_push_api import build_alert_rules_bundle; \
+  build_alert_rules_bundle('src/loki_alert_rules', recursive=True)"
+```
+
+This writes the normalized rule groups to `alert_rules.bundle.json` in the alert rules directory.
+If that file exists and was built with the same `recursive` flag, the consumers load it instead
+of the rule files, and only add the Juju topology at runtime. The bundle must be rebuilt whenever
+the rule files change.
+
 ## Relation Data
 
 The Loki charm uses both application and unit relation data to obtain information regarding
@@ -506,14 +534,15 @@ import logging
 import os
 import platform
 import re
+import shutil
 import socket
 import subprocess
 import tempfile
 import typing
 from copy import deepcopy
+from functools import cached_property
 from gzip import GzipFile
 from hashlib import sha256
-from io import BytesIO
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib import request
@@ -533,7 +562,7 @@ from ops.charm import (
     RelationRole,
     WorkloadEvent,
 )
-from ops.framework import EventBase, EventSource, Object, ObjectEvents
+from ops.framework import EventBase, EventSource, Object, ObjectEvents, StoredState
 from ops.jujuversion import JujuVersion
 from ops.model import Container, ModelError, Relation
 from ops.pebble import APIError, ChangeError, Layer, PathError, ProtocolError
@@ -546,7 +575,11 @@ LIBAPI = 1
 
 # Increment this PATCH version before using `charmcraft publish-lib` or reset
 # to 0 if you are raising the major API version
-LIBPATCH = 13
+# NOTE: this copy is an unpublished local fork of upstream LIBPATCH 13. Patch 14
+# has not been published, and upstream's own patch 14 will have different
+# content. Do not run `charmcraft fetch-lib charms.loki_k8s.v1.loki_push_api` over this
+# file until these changes have been upstreamed.
+LIBPATCH = 14
 
 PYDEPS = ["cosl"]
 
@@ -555,6 +588,8 @@ logger = logging.getLogger(__name__)
 RELATION_INTERFACE_NAME = "loki_push_api"
 DEFAULT_RELATION_NAME = "logging"
 DEFAULT_ALERT_RULES_RELATIVE_PATH = "./src/loki_alert_rules"
+ALERT_RULES_BUNDLE_FILENAME = "alert_rules.bundle.json"
+ALERT_RULES_BUNDLE_VERSION = 1
 DEFAULT_LOG_PROXY_RELATION_NAME = "log-proxy"
 
 PROMTAIL_BASE_URL = "https://github.com/canonical/loki-k8s-operator/releases/download"
@@ -580,6 +615,8 @@ PROMTAIL_BINARIES = {
 
 # Paths in `charm` container
 BINARY_DIR = "/tmp"
+# Size of the buffer used to download, decompress and hash the promtail binary
+STREAM_CHUNK_SIZE = 64 * 1024
 
 # Paths in `workload` container
 WORKLOAD_BINARY_DIR = "/opt/promtail"
@@ -835,28 +872,36 @@ class AlertRules:
                     alert_group["name"],
                 )
 
-                # add "juju_" topology labels
-                for alert_rule in alert_group["rules"]:
-                    if "labels" not in alert_rule:
-                        alert_rule["labels"] = {}
-
-                    if self.topology:
-                        # only insert labels that do not already exist
-                        for label, val in self.topology.label_matcher_dict.items():
-                            if label not in alert_rule["labels"]:
-                                alert_rule["labels"][label] = val
-
-                        # insert juju topology filters into a prometheus alert rule
-                        # logql doesn't like empty matchers, so add a job matcher which hits
-                        # any string as a "wildcard" which the topology labels will
-                        # filter down
-                        alert_rule["expr"] = self.tool.inject_label_matchers(
-                            re.sub(r"%%juju_topology%%", r'job=~".+"', alert_rule["expr"]),
-                            self.topology.label_matcher_dict,
-                        )
-
+            self._add_topology(alert_groups)
             return alert_groups
 
+    def _add_topology(self, alert_groups: List[dict]) -> None:
+        """Add the juju topology labels and label matchers to the rules of `alert_groups`."""
+        # add "juju_" topology labels
+        for alert_group in alert_groups:
+            for alert_rule in alert_group["rules"]:
+                if "labels" not in alert_rule:
+                    alert_rule["labels"] = {}
+
+                if self.topology:
+                    # only insert labels that do not already exist
+                    for label, val in self.topology.label_matcher_dict.items():
+                        if label not in alert_rule["labels"]:
+                            alert_rule["labels"][label] = val
+
+        if self.topology:
+            # insert juju topology filters into the alert rules of all groups in one batch
+            # logql doesn't like empty matchers, so add a job matcher which hits
+            # any string as a "wildcard" which the topology labels will
+            # filter down
+            alert_rules = [rule for group in alert_groups for rule in group["rules"]]
+            expressions = self.tool.inject_label_matchers_batch(
+                [re.sub(r"%%juju_topology%%", r'job=~".+"', rule["expr"]) for rule in alert_rules],
+                self.topology.label_matcher_dict,
+            )
+            for alert_rule, expression in zip(alert_rules, expressions):
+                alert_rule["expr"] = expression
+
     def _group_name(
         self,
         root_path: typing.Union[Path, str],
@@ -976,6 +1021,19 @@ class AlertRules:
         else:
             logger.debug("The alerts file does not exist: %s", path)
 
+    def add_bundle(self, bundle: dict):
+        """Add rules from a bundle made by `build_alert_rules_bundle`, adding the juju topology.
+
+        Args:
+            bundle: the loaded bundle, whose groups were read without juju topology.
+        """
+        alert_groups = deepcopy(bundle["groups"])
+        if self.topology:
+            for alert_group in alert_groups:
+                alert_group["name"] = "{}_{}".format(self.topology.identifier, alert_group["name"])
+        self._add_topology(alert_groups)
+        self.alert_groups.extend(alert_groups)
+
     def as_dict(self) -> dict:
         """Return standard alert rules file in dict representation.
 
@@ -987,6 +1045,48 @@ class AlertRules:
         return {"groups": self.alert_groups} if self.alert_groups else {}
 
 
+def build_alert_rules_bundle(alert_rules_path: str, *, recursive: bool = False) -> Path:
+    """Read the alert rule files once and store them as a bundle in the alert rules directory.
+
+    Meant to be run when the charm is built. The rule groups are stored without juju topology,
+    which consumers add at runtime.
+
+    Args:
+        alert_rules_path: the alert rules directory.
+        recursive: whether to read the rule files recursively, as the consumer does.
+
+    Returns:
+        The path of the bundle.
+    """
+    alert_rules = AlertRules(None)
+    alert_rules.add_path(alert_rules_path, recursive=recursive)
+    bundle = {
+        "version": ALERT_RULES_BUNDLE_VERSION,
+        "recursive": recursive,
+        "groups": alert_rules.alert_groups,
+    }
+    bundle_path = Path(alert_rules_path) / ALERT_RULES_BUNDLE_FILENAME
+    bundle_path.write_text(json.dumps(bundle, sort_keys=True, separators=(",", ":")))
+    return bundle_path
+
+
+def _load_alert_rules_bundle(alert_rules_path: str, recursive: bool) -> Optional[dict]:
+    """Return the alert rules bundle of `alert_rules_path`, or None if there is no usable one."""
+    bundle_path = Path(alert_rules_path) / ALERT_RULES_BUNDLE_FILENAME
+    try:
+        bundle = json.loads(bundle_path.read_text())
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning("Ignoring unreadable alert rules bundle %s: %s", bundle_path, e)
+        return None
+
+    if bundle.get("version") != ALERT_RULES_BUNDLE_VERSION or bundle.get("recursive") != recursive:
+        logger.debug("Ignoring alert rules bundle %s built with other options", bundle_path)
+        return None
+    return bundle
+
+
 def _resolve_dir_against_charm_path(charm: CharmBase, *path_elements: str) -> str:
     """Resolve the provided path items against the directory of the main file.
 
@@ -1536,6 +1636,8 @@ class LokiPushApiProvider(Object):
 class ConsumerBase(Object):
     """Consumer's base class."""
 
+    _stored = StoredState()
+
     def __init__(
         self,
         charm: CharmBase,
@@ -1547,36 +1649,85 @@ class ConsumerBase(Object):
         super().__init__(charm, relation_name)
         self._charm = charm
         self._relation_name = relation_name
-        self.topology = JujuTopology.from_charm(charm)
+        # The topology and the alert rules directory are only worked out when a logging event
+        # needs them, so that other events do not pay for them
+        self._alert_rules_relative_path = alert_rules_path
+        self._skip_alert_topology_labeling = skip_alert_topology_labeling
+
+        self._recursive = recursive
 
+        # The alert rule files only change with the charm, so the processed rules are cached
+        # until the next upgrade-charm, keyed on the topology and rule processing options
+        self._stored.set_default(alert_rules_key=None, alert_rules=None)
+        self.framework.observe(self._charm.on.upgrade_charm, self._invalidate_alert_rules)
+        # Relation id -> (raw unit endpoints, parsed unit endpoints) of the last parse
+        self._unit_endpoints_cache = {}  # type: Dict[int, Tuple[tuple, Dict[str, Optional[dict]]]]
+
+    @cached_property
+    def topology(self) -> JujuTopology:
+        """Return the Juju topology of the charm, built on first use."""
+        return JujuTopology.from_charm(self._charm)
+
+    @cached_property
+    def _alert_rules_path(self) -> str:
+        """Return the alert rules directory, resolved against the charm directory on first use."""
         try:
-            alert_rules_path = _resolve_dir_against_charm_path(charm, alert_rules_path)
+            return _resolve_dir_against_charm_path(self._charm, self._alert_rules_relative_path)
         except InvalidAlertRulePathError as e:
             logger.debug(
                 "Invalid Loki alert rules folder at %s: %s",
                 e.alert_rules_absolute_path,
                 e.message,
             )
-        self._alert_rules_path = alert_rules_path
-        self._skip_alert_topology_labeling = skip_alert_topology_labeling
+            return self._alert_rules_relative_path
 
-        self._recursive = recursive
+    def _invalidate_alert_rules(self, _):
+        self._stored.alert_rules_key = None
+        self._stored.alert_rules = None
 
-    def _handle_alert_rules(self, relation):
-        if not self._charm.unit.is_leader():
-            return
+    def _alert_rules_json(self) -> str:
+        """Return the serialized alert rules, processing the rule files only if not cached."""
+        key = sha256(
+            json.dumps(
+                {
+                    "topology": self.topology.as_dict(),
+                    "path": str(self._alert_rules_path),
+                    "recursive": self._recursive,
+                    "skip_topology_labeling": self._skip_alert_topology_labeling,
+                },
+                sort_keys=True,
+            ).encode()
+        ).hexdigest()
+        if self._stored.alert_rules_key == key:
+            return self._stored.alert_rules
 
         alert_rules = (
             AlertRules(None) if self._skip_alert_topology_labeling else AlertRules(self.topology)
         )
-        alert_rules.add_path(self._alert_rules_path, recursive=self._recursive)
-        alert_rules_as_dict = alert_rules.as_dict()
-
-        relation.data[self._charm.app]["metadata"] = json.dumps(self.topology.as_dict())
-        relation.data[self._charm.app]["alert_rules"] = json.dumps(
-            alert_rules_as_dict,
+        bundle = _load_alert_rules_bundle(self._alert_rules_path, self._recursive)
+        if bundle:
+            alert_rules.add_bundle(bundle)
+        else:
+            alert_rules.add_path(self._alert_rules_path, recursive=self._recursive)
+        alert_rules_json = json.dumps(
+            alert_rules.as_dict(),
             sort_keys=True,  # sort, to prevent unnecessary relation_changed events
         )
+        self._stored.alert_rules_key = key
+        self._stored.alert_rules = alert_rules_json
+        return alert_rules_json
+
+    def _handle_alert_rules(self, relation):
+        if not self._charm.unit.is_leader():
+            return
+
+        databag = relation.data[self._charm.app]
+        metadata = json.dumps(self.topology.as_dict())
+        if databag.get("metadata") != metadata:
+            databag["metadata"] = metadata
+        alert_rules = self._alert_rules_json()
+        if databag.get("alert_rules") != alert_rules:
+            databag["alert_rules"] = alert_rules
 
     @property
     def loki_endpoints(self) -> List[dict]:
@@ -1592,16 +1743,45 @@ class ConsumerBase(Object):
         endpoints = []  # type: list
 
         for relation in self._charm.model.relations[self._relation_name]:
-            for unit in relation.units:
-                if unit.app == self._charm.app:
-                    # This is a peer unit
-                    continue
+            endpoints.extend(
+                endpoint for endpoint in self._unit_endpoints(relation).values() if endpoint
+            )
 
-                endpoint = relation.data[unit].get("endpoint")
-                if endpoint:
-                    deserialized_endpoint = json.loads(endpoint)
-                    endpoints.append(deserialized_endpoint)
+        return endpoints
+
+    def _unit_endpoints(self, relation: Relation) -> Dict[str, Optional[dict]]:
+        """Return the deserialized `endpoint` of each remote unit of `relation`.
 
+        The endpoints are parsed once and reused while the relation data is unchanged. Units
+        without an endpoint, or with a malformed one, map to None; malformed endpoints are only
+        reported when they are parsed.
+        """
+        raw = tuple(
+            (unit.name, relation.data[unit].get("endpoint"))
+            for unit in relation.units
+            # Skip peer units
+            if unit.app != self._charm.app
+        )
+        cached = self._unit_endpoints_cache.get(relation.id)
+        if cached and cached[0] == raw:
+            return cached[1]
+
+        endpoints = {}  # type: Dict[str, Optional[dict]]
+        for unit_name, endpoint in raw:
+            endpoints[unit_name] = None
+            if not endpoint:
+                continue
+            try:
+                deserialized_endpoint = json.loads(endpoint)
+            except json.JSONDecodeError as e:
+                logger.warning("Malformed Loki endpoint from %s: %s", unit_name, e)
+                continue
+            if not isinstance(deserialized_endpoint, dict):
+                logger.warning("Malformed Loki endpoint from %s: %s", unit_name, endpoint)
+                continue
+            endpoints[unit_name] = deserialized_endpoint
+
+        self._unit_endpoints_cache[relation.id] = (raw, endpoints)
         return endpoints
 
 
@@ -1867,7 +2047,6 @@ class LogProxyConsumer(ConsumerBase):
         self._charm = charm
         self._logs_scheme = logs_scheme or {}
         self._relation_name = relation_name
-        self.topology = JujuTopology.from_charm(charm)
         self._promtail_resource_name = promtail_resource_name or "promtail-bin"
         self.insecure_skip_verify = insecure_skip_verify
         self._promtails_ports = self._generate_promtails_ports(logs_scheme)
@@ -2104,8 +2283,10 @@ class LogProxyConsumer(ConsumerBase):
         """
         try:
             with open(file_path, "rb") as f:
-                file_bytes = f.read()
-                result = sha256(file_bytes).hexdigest()
+                file_hash = sha256()
+                for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+                    file_hash.update(chunk)
+                result = file_hash.hexdigest()
 
                 if result != sha256sum:
                     msg = "File sha256sum mismatch, expected:'{}' but got '{}'".format(
@@ -2161,21 +2342,21 @@ class LogProxyConsumer(ConsumerBase):
         proxy_handler = request.ProxyHandler(proxies)
         opener = request.build_opener(proxy_handler)
 
+        # Stream the download and the decompression through a small buffer, as the binary is
+        # several hundred MB once decompressed
         with opener.open(promtail_info["url"]) as r:
-            file_bytes = r.read()
             file_path = os.path.join(BINARY_DIR, promtail_info["filename"] + ".gz")
             with open(file_path, "wb") as f:
-                f.write(file_bytes)
+                shutil.copyfileobj(r, f, STREAM_CHUNK_SIZE)
                 logger.info(
                     "Promtail binary zip file has been downloaded and stored in: %s",
                     file_path,
                 )
 
-            decompressed_file = GzipFile(fileobj=BytesIO(file_bytes))
-            binary_path = os.path.join(BINARY_DIR, promtail_info["filename"])
-            with open(binary_path, "wb") as outfile:
-                outfile.write(decompressed_file.read())
-                logger.debug("Promtail binary file has been downloaded.")
+        binary_path = os.path.join(BINARY_DIR, promtail_info["filename"])
+        with GzipFile(file_path) as decompressed_file, open(binary_path, "wb") as outfile:
+            shutil.copyfileobj(decompressed_file, outfile, STREAM_CHUNK_SIZE)
+            logger.debug("Promtail binary file has been downloaded.")
 
         workload_binary_path = os.path.join(WORKLOAD_BINARY_DIR, promtail_info["filename"])
         self._push_binary_to_workload(container, binary_path, workload_binary_path)
@@ -2431,9 +2612,9 @@ class LogProxyConsumer(ConsumerBase):
 
 class _PebbleLogClient:
     @staticmethod
-    def check_juju_version() -> bool:
+    def check_juju_version(juju_version: Optional[JujuVersion] = None) -> bool:
         """Make sure the Juju version supports Log Forwarding."""
-        juju_version = JujuVersion.from_environ()
+        juju_version = juju_version or JujuVersion.from_environ()
         if not juju_version > JujuVersion(version=str("3.3")):
             msg = f"Juju version {juju_version} does not support Pebble log forwarding. Juju >= 3.4 is needed."
             logger.warning(msg)
@@ -2442,14 +2623,27 @@ class _PebbleLogClient:
 
     @staticmethod
     def _build_log_target(
-        unit_name: str, loki_endpoint: str, topology: JujuTopology, enable: bool
+        unit_name: str,
+        loki_endpoint: str,
+        topology: JujuTopology,
+        enable: bool,
+        services: Optional[List[str]] = None,
+        labels: Optional[Dict[str, str]] = None,
     ) -> Dict:
         """Build a log target for the log forwarding Pebble layer.
 
         Log target's syntax for enabling/disabling forwarding is explained here:
         https://github.com/canonical/pebble?tab=readme-ov-file#log-forwarding
+
+        Args:
+            unit_name: name of the Loki unit, used as the name of the target.
+            loki_endpoint: the Loki push API URL.
+            topology: the Juju topology added as labels to the forwarded logs.
+            enable: whether to enable or disable forwarding to this target.
+            services: the services whose logs are forwarded, all of them by default.
+            labels: custom labels added to the forwarded logs, besides the topology labels.
         """
-        services_value = ["all"] if enable else ["-all"]
+        services_value = (services or ["all"]) if enable else ["-all"]
 
         log_target = {
             "override": "replace",
@@ -2461,6 +2655,7 @@ class _PebbleLogClient:
             log_target.update(
                 {
                     "labels": {
+                        **(labels or {}),
                         "product": "Juju",
                         "charm": topology._charm_name,
                         "juju_model": topology._model,
@@ -2475,7 +2670,11 @@ class _PebbleLogClient:
 
     @staticmethod
     def _build_log_targets(
-        loki_endpoints: Optional[Dict[str, str]], topology: JujuTopology, enable: bool
+        loki_endpoints: Optional[Dict[str, str]],
+        topology: JujuTopology,
+        enable: bool,
+        services: Optional[List[str]] = None,
+        labels: Optional[Dict[str, str]] = None,
     ):
         """Build all the targets for the log forwarding Pebble layer."""
         targets = {}
@@ -2489,51 +2688,64 @@ class _PebbleLogClient:
                     loki_endpoint=endpoint,
                     topology=topology,
                     enable=enable,
+                    services=services,
+                    labels=labels,
                 )
             )
         return targets
 
     @staticmethod
-    def disable_inactive_endpoints(
-        container: Container, active_endpoints: Dict[str, str], topology: JujuTopology
-    ):
-        """Disable forwarding for inactive endpoints by checking against the Pebble plan."""
-        pebble_layer = container.get_plan().to_dict().get("log-targets", None)
-        if not pebble_layer:
-            return
-
-        for unit_name, target in pebble_layer.items():
-            # If the layer is a disabled log forwarding endpoint, skip it
-            if "-all" in target["services"]:  # pyright: ignore
-                continue
-
-            if unit_name not in active_endpoints:
-                layer = Layer(
-                    {  # pyright: ignore
-                        "log-targets": _PebbleLogClient._build_log_targets(
-                            loki_endpoints={unit_name: "(removed)"},
-                            topology=topology,
-                            enable=False,
-                        )
-                    }
-                )
-                container.add_layer(f"{container.name}-log-forwarding", layer=layer, combine=True)
+    def _build_inactive_log_targets(
+        current_targets: Dict[str, Dict], active_endpoints: Dict[str, str], topology: JujuTopology
+    ) -> Dict:
+        """Build disabled targets for the enabled targets of the plan that are no longer active."""
+        inactive_endpoints = {
+            unit_name: "(removed)"
+            for unit_name, target in current_targets.items()
+            # Skip the targets that are already disabled
+            if "-all" not in target["services"] and unit_name not in active_endpoints
+        }
+        return _PebbleLogClient._build_log_targets(
+            loki_endpoints=inactive_endpoints, topology=topology, enable=False
+        )
 
     @staticmethod
-    def enable_endpoints(
-        container: Container, active_endpoints: Dict[str, str], topology: JujuTopology
-    ):
-        """Enable forwarding for the specified Loki endpoints."""
-        layer = Layer(
-            {  # pyright: ignore
-                "log-targets": _PebbleLogClient._build_log_targets(
-                    loki_endpoints=active_endpoints,
-                    topology=topology,
-                    enable=True,
-                )
-            }
+    def update_endpoints(
+        container: Container,
+        active_endpoints: Dict[str, str],
+        topology: JujuTopology,
+        services: Optional[List[str]] = None,
+        labels: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """Enable forwarding for the active Loki endpoints and disable it for inactive ones.
+
+        The targets are computed against the Pebble plan and applied as a single layer, so this
+        takes at most two Pebble API calls whatever the number of endpoints. The layer is only
+        added if the plan's log targets differ from the desired ones.
+
+        Returns:
+            True if the log forwarding layer was added, False if the plan was already up to date.
+        """
+        current_targets = container.get_plan().to_dict().get("log-targets", {})
+        log_targets = _PebbleLogClient._build_inactive_log_targets(
+            current_targets=current_targets, active_endpoints=active_endpoints, topology=topology
         )
+        log_targets.update(
+            _PebbleLogClient._build_log_targets(
+                loki_endpoints=active_endpoints,
+                topology=topology,
+                enable=True,
+                services=services,
+                labels=labels,
+            )
+        )
+        if all(current_targets.get(name) == target for name, target in log_targets.items()):
+            logger.debug("Log targets of container %s are up to date", container.name)
+            return False
+
+        layer = Layer({"log-targets": log_targets})  # pyright: ignore
         container.add_layer(f"{container.name}-log-forwarding", layer, combine=True)
+        return True
 
 
 class LogForwarder(ConsumerBase):
@@ -2550,13 +2762,30 @@ class LogForwarder(ConsumerBase):
         alert_rules_path: str = DEFAULT_ALERT_RULES_RELATIVE_PATH,
         recursive: bool = True,
         skip_alert_topology_labeling: bool = False,
+        services: Optional[List[str]] = None,
+        labels: Optional[Dict[str, str]] = None,
     ):
-        _PebbleLogClient.check_juju_version()
+        """Construct a LogForwarder.
+
+        Args:
+            charm: the charm forwarding the logs of its workloads.
+            relation_name: name of the relation with the Loki endpoints.
+            alert_rules_path: path of the Loki alert rules directory.
+            recursive: whether to read the alert rules directory recursively.
+            skip_alert_topology_labeling: whether to leave the alert rules without topology.
+            services: the Pebble services whose logs are forwarded, all of them by default.
+            labels: custom labels added to the forwarded logs, besides the topology labels.
+        """
         super().__init__(
             charm, relation_name, alert_rules_path, recursive, skip_alert_topology_labeling
         )
         self._charm = charm
         self._relation_name = relation_name
+        self._services = services
+        self._labels = labels
+        self._juju_version_checked = False
+        # Digest of the endpoints and topology last applied to each container
+        self._stored.set_default(log_targets_digests={})
 
         on = self._charm.on[self._relation_name]
         self.framework.observe(on.relation_joined, self._update_logging)
@@ -2571,6 +2800,13 @@ class LogForwarder(ConsumerBase):
                 self._on_pebble_ready,
             )
 
+    def _check_juju_version(self):
+        """Check, when logs are first forwarded, that the Juju version supports it."""
+        if self._juju_version_checked:
+            return
+        self._juju_version_checked = True
+        _PebbleLogClient.check_juju_version(self._charm.model.juju_version)
+
     def _on_pebble_ready(self, event: PebbleReadyEvent):
         if not (loki_endpoints := self._retrieve_endpoints_from_relation()):
             logger.warning("No Loki endpoints available")
@@ -2586,7 +2822,7 @@ class LogForwarder(ConsumerBase):
 
         for container in self._charm.unit.containers.values():
             if container.can_connect():
-                self._update_endpoints(container, loki_endpoints)
+                self._update_endpoints(container, loki_endpoints, skip_if_applied=True)
             # else: `_update_endpoints` will be called on pebble-ready anyway.
 
         self._handle_alert_rules(event.relation)
@@ -2600,15 +2836,39 @@ class LogForwarder(ConsumerBase):
 
         return loki_endpoints
 
-    def _update_endpoints(self, container: Container, loki_endpoints: dict):
-        _PebbleLogClient.disable_inactive_endpoints(
+    def _update_endpoints(
+        self, container: Container, loki_endpoints: dict, skip_if_applied: bool = False
+    ):
+        """Update the log targets of `container` to forward logs to `loki_endpoints`.
+
+        If `skip_if_applied` is True and the same endpoints were last applied to this container,
+        the Pebble plan is not even read. Pebble-ready never skips, as the plan may have been
+        reset by a workload container restart.
+        """
+        digest = sha256(
+            json.dumps(
+                {
+                    "endpoints": loki_endpoints,
+                    "topology": self.topology.as_dict(),
+                    "services": self._services,
+                    "labels": self._labels,
+                },
+                sort_keys=True,
+            ).encode()
+        ).hexdigest()
+        if skip_if_applied and self._stored.log_targets_digests.get(container.name) == digest:
+            logger.debug("Log targets of container %s already applied", container.name)
+            return
+
+        self._check_juju_version()
+        _PebbleLogClient.update_endpoints(
             container=container,
             active_endpoints=loki_endpoints,
             topology=self.topology,
+            services=self._services,
+            labels=self._labels,
         )
-        _PebbleLogClient.enable_endpoints(
-            container=container, active_endpoints=loki_endpoints, topology=self.topology
-        )
+        self._stored.log_targets_digests[container.name] = digest
 
     def is_ready(self, relation: Optional[Relation] = None):
         """Check if the relation is active and healthy."""
@@ -2622,7 +2882,7 @@ class LogForwarder(ConsumerBase):
             if self._extract_urls(relation):
                 return True
             return False
-        except (KeyError, json.JSONDecodeError):
+        except KeyError:
             return False
 
     def _extract_urls(self, relation: Relation) -> Dict[str, str]:
@@ -2637,11 +2897,10 @@ class LogForwarder(ConsumerBase):
         """
         endpoints: Dict = {}
 
-        for unit in relation.units:
-            endpoint = relation.data[unit]["endpoint"]
-            deserialized_endpoint = json.loads(endpoint)
-            url = deserialized_endpoint["url"]
-            endpoints[unit.name] = url
+        for unit_name, endpoint in self._unit_endpoints(relation).items():
+            if not endpoint:
+                raise KeyError(f"No valid endpoint from {unit_name}")
+            endpoints[unit_name] = endpoint["url"]
 
         return endpoints
 
@@ -2654,12 +2913,65 @@ class LogForwarder(ConsumerBase):
             return endpoints
 
         # if the code gets here, the function won't raise anymore because it's
-        # also called in is_ready()
+        # also called in is_ready(), whose parse of the relation data is reused
         endpoints = self._extract_urls(relation)
 
         return endpoints
 
 
+# LogQL tokens needed to find the stream selectors of an expression
+_LOGQL_STRING = r'"(?:[^"\\]|\\.)*"|`[^`]*`'
+_LOGQL_TOKEN_RE = re.compile(r"{}|[{{}}]".format(_LOGQL_STRING))
+_LOGQL_MATCHER = r'\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*(?:=~|!~|!=|=)\s*(?:{})\s*'.format(_LOGQL_STRING)
+_LOGQL_SELECTOR_RE = re.compile(r"(?:{0}(?:,{0})*)?\s*".format(_LOGQL_MATCHER))
+_LOGQL_MATCHER_RE = re.compile(_LOGQL_MATCHER)
+
+
+def _inject_simple_label_matchers(expression: str, topology: dict) -> Optional[str]:
+    """Add label matchers to every stream selector of a simple LogQL expression, in Python.
+
+    An expression is simple if its only braces outside of string literals are non-nested stream
+    selectors made of plain `label<op>"value"` matchers. Matchers for labels a selector already
+    has are not added.
+
+    Returns:
+        The expression with the label matchers added, or None if it is not simple, in which case
+        it has to go through cos-tool.
+    """
+    selectors = []
+    start = None
+    for token in _LOGQL_TOKEN_RE.finditer(expression):
+        if token.group() == "{":
+            if start is not None:
+                return None
+            start = token.end()
+        elif token.group() == "}":
+            if start is None:
+                return None
+            selectors.append((start, token.start()))
+            start = None
+    if start is not None or not selectors:
+        return None
+
+    injected = []
+    last = 0
+    for begin, end in selectors:
+        content = expression[begin:end]
+        if not _LOGQL_SELECTOR_RE.fullmatch(content):
+            return None
+        labels = {match.group(1) for match in _LOGQL_MATCHER_RE.finditer(content)}
+        matchers = [
+            '{}="{}"'.format(key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+            for key, value in topology.items()
+            if key not in labels
+        ]
+        if content.strip():
+            matchers.insert(0, content.strip())
+        injected.append(expression[last:begin] + ", ".join(matchers))
+        last = end
+    return "".join(injected) + expression[last:]
+
+
 class CosTool:
     """Uses cos-tool to inject label matchers into alert rule expressions and validate rules."""
 
@@ -2685,6 +2997,8 @@ class CosTool:
         """Will apply label matchers to the expression of all alerts in all supplied groups."""
         if not self.path:
             return rules
+        # Rules sharing the same topology labels are injected in one batch
+        batches = {}  # type: Dict[Tuple[Tuple[str, str], ...], List[dict]]
         for group in rules["groups"]:
             rules_in_group = group.get("rules", [])
             for rule in rules_in_group:
@@ -2701,7 +3015,14 @@ class CosTool:
                     if label in rule["labels"]:
                         topology[label] = rule["labels"][label]
 
-                rule["expr"] = self.inject_label_matchers(rule["expr"], topology)
+                batches.setdefault(tuple(topology.items()), []).append(rule)
+
+        for topology_items, batch in batches.items():
+            expressions = self.inject_label_matchers_batch(
+                [rule["expr"] for rule in batch], dict(topology_items)
+            )
+            for rule, expression in zip(batch, expressions):
+                rule["expr"] = expression
         return rules
 
     def validate_alert_rules(self, rules: dict) -> Tuple[bool, str]:
@@ -2736,10 +3057,28 @@ class CosTool:
                 logger.debug("Validating the rules failed: %s", e.output)
                 return False, ", ".join([line for line in e.output if "error validating" in line])
 
+    def inject_label_matchers_batch(self, expressions: List[str], topology) -> List[str]:
+        """Add the same label matchers to many expressions.
+
+        Each distinct expression is injected once. Simple expressions are injected in Python, so
+        cos-tool is only run for the expressions it has to parse.
+
+        Returns:
+            The injected expressions, in the order of `expressions`.
+        """
+        injected = {
+            expression: self.inject_label_matchers(expression, topology)
+            for expression in dict.fromkeys(expressions)
+        }
+        return [injected[expression] for expression in expressions]
+
     def inject_label_matchers(self, expression, topology) -> str:
         """Add label matchers to an expression."""
         if not topology:
             return expression
+        simple = _inject_simple_label_matchers(expression, topology)
+        if simple is not None:
+            return simple
         if not self.path:
             logger.debug("`cos-tool` unavailable. Leaving expression unchanged: %s", expression)
             return expression
@@ -48,11 +48,12 @@ class ApiGatewayCharm(CharmBase):
 ```
 """
 
+import hashlib
 import inspect
 import json
 import logging
 from dataclasses import asdict, dataclass, field
-from typing import Dict, List, Mapping, Optional
+from typing import Dict, Iterable, List, Mapping, Optional, Set
 
 import jsonschema
 from ops.charm import CharmBase, RelationBrokenEvent, RelationChangedEvent, RelationCreatedEvent
@@ -67,7 +68,11 @@ LIBAPI = 0
 
 # Increment this PATCH version before using `charmcraft publish-lib` or reset
 # to 0 if you are raising the major API version
-LIBPATCH = 2
+# NOTE: this copy is an unpublished local fork of upstream LIBPATCH 2. Patch 3
+# has not been published, and upstream's own patch 3 will have different
+# content. Do not run `charmcraft fetch-lib charms.oauth2_proxy_k8s.v0.forward_auth` over this
+# file until these changes have been upstreamed.
+LIBPATCH = 3
 
 RELATION_NAME = "forward-auth"
 INTERFACE_NAME = "forward_auth"
@@ -156,15 +161,46 @@ class ForwardAuthRelation(Object):
             logger.info(f"Failed to pop the relation data: {e}")
 
 
+# Validators compiled once per schema, keyed by the schema's `$id`
+_VALIDATORS: Dict[str, jsonschema.protocols.Validator] = {}
+# Digest of the last payload that passed validation, keyed by the schema's `$id`
+_VALIDATED_DIGESTS: Dict[str, str] = {}
+
+
+def _schema_key(schema: Dict) -> str:
+    return schema.get("$id") or json.dumps(schema, sort_keys=True)
+
+
+def _get_validator(schema: Dict) -> jsonschema.protocols.Validator:
+    """Return a validator for `schema`, checking and compiling the schema on first use only."""
+    key = _schema_key(schema)
+    if key not in _VALIDATORS:
+        cls = jsonschema.validators.validator_for(schema)
+        cls.check_schema(schema)
+        _VALIDATORS[key] = cls(schema)
+    return _VALIDATORS[key]
+
+
 def _validate_data(data: Dict, schema: Dict) -> None:
     """Checks whether `data` matches `schema`.
 
     Will raise DataValidationError if the data is not valid, else return None.
+    Validation is skipped if `data` is identical to the last payload validated against `schema`.
     """
+    key = _schema_key(schema)
+    digest = hashlib.sha256(json.dumps(data, sort_keys=True, default=repr).encode()).hexdigest()
+    if _VALIDATED_DIGESTS.get(key) == digest:
+        return
+
     try:
-        jsonschema.validate(instance=data, schema=schema)
+        _get_validator(schema).validate(data)
     except jsonschema.ValidationError as e:
         raise DataValidationError(data, schema) from e
+    _VALIDATED_DIGESTS[key] = digest
+
+
+for _schema in (FORWARD_AUTH_PROVIDER_JSON_SCHEMA, FORWARD_AUTH_REQUIRER_JSON_SCHEMA):
+    _get_validator(_schema)
 
 
 @dataclass
@@ -426,33 +462,56 @@ class ForwardAuthRequirer(ForwardAuthRelation):
 
 
 class ForwardAuthProxySet(EventBase):
-    """Event to notify the charm that the proxy was set successfully."""
+    """Event to notify the charm that the proxy was set successfully.
+
+    `valid_apps` holds the requested apps that are related via ingress.
+    """
+
+    def __init__(self, handle: Handle, valid_apps: Optional[Iterable[str]] = None) -> None:
+        super().__init__(handle)
+        self.valid_apps: Set[str] = set(valid_apps or ())
 
     def snapshot(self) -> Dict:
         """Save event."""
-        return {}
+        return {"valid_apps": sorted(self.valid_apps)}
 
     def restore(self, snapshot: Dict) -> None:
         """Restore event."""
-        pass
+        self.valid_apps = set(snapshot.get("valid_apps", ()))
 
 
 class InvalidForwardAuthConfigEvent(EventBase):
-    """Event to notify the charm that the forward-auth configuration is invalid."""
+    """Event to notify the charm that the forward-auth configuration is invalid.
+
+    If the configuration is invalid because some requested apps are not related via ingress,
+    `invalid_apps` holds those apps and `valid_apps` the requested apps that are.
+    """
 
-    def __init__(self, handle: Handle, error: str) -> None:
+    def __init__(
+        self,
+        handle: Handle,
+        error: str,
+        invalid_apps: Optional[Iterable[str]] = None,
+        valid_apps: Optional[Iterable[str]] = None,
+    ) -> None:
         super().__init__(handle)
         self.error = error
+        self.invalid_apps: Set[str] = set(invalid_apps or ())
+        self.valid_apps: Set[str] = set(valid_apps or ())
 
     def snapshot(self) -> Dict:
         """Save event."""
         return {
             "error": self.error,
+            "invalid_apps": sorted(self.invalid_apps),
+            "valid_apps": sorted(self.valid_apps),
         }
 
     def restore(self, snapshot: Dict) -> None:
         """Restore event."""
         self.error = snapshot["error"]
+        self.invalid_apps = set(snapshot.get("invalid_apps", ()))
+        self.valid_apps = set(snapshot.get("valid_apps", ()))
 
 
 class ForwardAuthRelationRemovedEvent(EventBase):
@@ -484,7 +543,16 @@ class ForwardAuthProviderEvents(ObjectEvents):
 
 
 class ForwardAuthProvider(ForwardAuthRelation):
-    """Provider side of the forward-auth relation."""
+    """Provider side of the forward-auth relation.
+
+    The protected apps are the `app_names` of the forward-auth config plus the apps added at
+    runtime with `add_app_names`. The apps added at runtime are kept in their own
+    `runtime_app_names` field of the application databag, so every unit, and a newly elected
+    leader, sees the same set for as long as a forward-auth relation exists, and an app dropped
+    from the config is never mistaken for one added at runtime. Changes to this set only rewrite
+    the `app_names` and `runtime_app_names` fields of the relation databags, and only if they
+    changed.
+    """
 
     on = ForwardAuthProviderEvents()
 
@@ -533,9 +601,9 @@ class ForwardAuthProvider(ForwardAuthRelation):
         """Compare app names provided by OAuth2 Proxy with apps that are related via ingress.
 
         The ingress-related app names are provided by the relation requirer.
-        If an app is not related via ingress-per-app/leader/unit,
-        emit `InvalidForwardAuthConfigEvent`.
-        If the app is related via ingress and thus eligible for IAP, emit `ForwardAuthProxySet`.
+        If any app is not related via ingress-per-app/leader/unit,
+        emit one `InvalidForwardAuthConfigEvent` carrying the invalid and valid apps.
+        Otherwise all apps are eligible for IAP, emit one `ForwardAuthProxySet`.
         """
         if len(self.model.relations) == 0:
             return None
@@ -548,21 +616,38 @@ class ForwardAuthProvider(ForwardAuthRelation):
         if not relation or not relation.app:
             return None
 
-        requirer_data = relation.data[relation.app]
-        if not requirer_data:
+        if not relation.data[relation.app]:
             logger.info("No requirer relation data available.")
             return
 
-        ingress_apps = requirer_data["ingress_app_names"]
+        try:
+            ingress_apps = self._load_ingress_app_names(relation)
+        except DataValidationError as e:
+            self.on.invalid_forward_auth_config.emit(
+                error=f"Received invalid ingress app names from the requirer: {e}"
+            )
+            return
 
-        for app in json.loads(relation.data[self.model.app]["app_names"]):
-            if app not in ingress_apps:
-                self.on.invalid_forward_auth_config.emit(error=f"{app} is not related via ingress")
-                return
-            self.on.forward_auth_proxy_set.emit()
+        requested_apps = set(json.loads(relation.data[self.model.app].get("app_names", "[]")))
+        if not requested_apps:
+            return
+
+        invalid_apps = requested_apps - ingress_apps
+        valid_apps = requested_apps & ingress_apps
+
+        if invalid_apps:
+            self.on.invalid_forward_auth_config.emit(
+                error=f"{', '.join(sorted(invalid_apps))} not related via ingress",
+                invalid_apps=invalid_apps,
+                valid_apps=valid_apps,
+            )
+            return
+        self.on.forward_auth_proxy_set.emit(valid_apps=valid_apps)
 
     def _update_relation_data(
-        self, forward_auth_config: Optional[ForwardAuthConfig], relation_id: Optional[int] = None
+        self,
+        forward_auth_config: Optional[ForwardAuthConfig],
+        relation_id: Optional[int] = None,
     ) -> None:
         """Validate the forward-auth config and update the relation databag."""
         if not self.model.unit.is_leader():
@@ -587,11 +672,90 @@ class ForwardAuthProvider(ForwardAuthRelation):
         if not relation or not relation.app:
             return
 
-        data = _dump_data(forward_auth_config.to_dict(), FORWARD_AUTH_PROVIDER_JSON_SCHEMA)
-        relation.data[self.model.app].update(data)
+        config = forward_auth_config.to_dict()
+        runtime_app_names = self._runtime_app_names()
+        config["app_names"] = sorted(set(forward_auth_config.app_names) | runtime_app_names)
+        config["runtime_app_names"] = sorted(runtime_app_names)
+        data = _dump_data(config, FORWARD_AUTH_PROVIDER_JSON_SCHEMA)
+        databag = relation.data[self.model.app]
+        changed = {k: v for k, v in data.items() if databag.get(k) != v}
+        if changed:
+            databag.update(changed)
 
     def update_forward_auth_config(
         self, forward_auth_config: ForwardAuthConfig, relation_id: Optional[int] = None
     ) -> None:
         """Update the forward-auth config stored in the object."""
+        self.forward_auth_config = forward_auth_config
         self._update_relation_data(forward_auth_config, relation_id=relation_id)
+
+    @property
+    def app_names(self) -> List[str]:
+        """Return the apps protected by the proxy, from the config and added at runtime."""
+        configured = self.forward_auth_config.app_names if self.forward_auth_config else []
+        return sorted(set(configured) | self._runtime_app_names())
+
+    @property
+    def ingress_app_names(self) -> Set[str]:
+        """Return the apps the requirers route through ingress, skipping invalid requirer data."""
+        ingress_app_names: Set[str] = set()
+        for relation in self.model.relations[self._relation_name]:
+            if not relation.app or not relation.data[relation.app]:
+                continue
+            try:
+                ingress_app_names.update(self._load_ingress_app_names(relation))
+            except DataValidationError as e:
+                logger.warning(f"Ignoring invalid ingress app names from {relation.app.name}: {e}")
+        return ingress_app_names
+
+    def add_app_names(self, app_names: Iterable[str]) -> None:
+        """Protect `app_names`, publishing the new app set if it changed.
+
+        Only the leader can publish, so this does nothing on other units.
+        """
+        self._set_app_names(self._runtime_app_names() | set(app_names))
+
+    def remove_app_names(self, app_names: Iterable[str]) -> None:
+        """Stop protecting `app_names` added at runtime, publishing the new app set if it changed.
+
+        Apps listed in the forward-auth config stay protected. Only the leader can publish, so
+        this does nothing on other units.
+        """
+        self._set_app_names(self._runtime_app_names() - set(app_names))
+
+    def _load_ingress_app_names(self, relation: Relation) -> Set[str]:
+        """Return the ingress app names of a requirer, raising DataValidationError if invalid."""
+        requirer_data = relation.data[relation.app]  # type: ignore[index]
+        return set(
+            _load_data(requirer_data, FORWARD_AUTH_REQUIRER_JSON_SCHEMA)["ingress_app_names"]
+        )
+
+    def _runtime_app_names(self) -> Set[str]:
+        """Return the apps added at runtime, as published by the leader."""
+        for relation in self.model.relations[self._relation_name]:
+            published = relation.data[self.model.app].get("runtime_app_names")
+            if published:
+                return set(json.loads(published))
+        return set()
+
+    def _set_app_names(self, runtime_app_names: Set[str]) -> None:
+        if not self.model.unit.is_leader() or self._runtime_app_names() == runtime_app_names:
+            return
+        self._publish_app_names(runtime_app_names)
+
+    def _publish_app_names(self, runtime_app_names: Set[str]) -> None:
+        """Write the app sets to every relation that already has the provider config."""
+        configured = self.forward_auth_config.app_names if self.forward_auth_config else []
+        data = _dump_data(
+            {
+                "app_names": sorted(set(configured) | runtime_app_names),
+                "runtime_app_names": sorted(runtime_app_names),
+            }
+        )
+        for relation in self.model.relations[self._relation_name]:
+            databag = relation.data[self.model.app]
+            if "decisions_address" not in databag:
+                continue
+            changed = {k: v for k, v in data.items() if databag.get(k) != v}
+            if changed:
+                databag.update(changed)
@@ -10,7 +10,10 @@ For patching the Kubernetes service created by Juju during the deployment of a c
 
 """
 
+import hashlib
+import json
 import logging
+import time
 from types import MethodType
 from typing import Any, List, Literal, Optional, Union
 
@@ -22,7 +25,7 @@ from lightkube.resources.core_v1 import Service
 from lightkube.types import PatchType
 from ops import UpgradeCharmEvent
 from ops.charm import CharmBase
-from ops.framework import BoundEvent, Object
+from ops.framework import BoundEvent, Object, StoredState
 
 logger = logging.getLogger(__name__)
 
@@ -34,14 +37,23 @@ LIBAPI = 1
 
 # Increment this PATCH version before using `charmcraft publish-lib` or reset
 # to 0 if you are raising the major API version
-LIBPATCH = 13
+# NOTE: this copy is an unpublished local fork of upstream LIBPATCH 13. Patch 14
+# has not been published, and upstream's own patch 14 will have different
+# content. Do not run `charmcraft fetch-lib charms.observability_libs.v1.kubernetes_service_patch` over this
+# file until these changes have been upstreamed.
+LIBPATCH = 14
 
 ServiceType = Literal["ClusterIP", "LoadBalancer"]
 
+# Default number of seconds between two Service GETs triggered by update-status
+DEFAULT_UPDATE_STATUS_CHECK_INTERVAL = 3600
+
 
 class KubernetesServicePatch(Object):
     """A utility for patching the Kubernetes service set up by Juju."""
 
+    _stored = StoredState()
+
     def __init__(
         self,
         charm: CharmBase,
@@ -53,6 +65,10 @@ class KubernetesServicePatch(Object):
         additional_annotations: Optional[dict] = None,
         *,
         refresh_event: Optional[Union[BoundEvent, List[BoundEvent]]] = None,
+        update_status_check_interval: float = DEFAULT_UPDATE_STATUS_CHECK_INTERVAL,
+        lightkube_client: Optional[Client] = None,
+        server_side_apply: bool = False,
+        traffic_distribution: Optional[str] = None,
     ):
         """Constructor for KubernetesServicePatch.
 
@@ -71,6 +87,21 @@ class KubernetesServicePatch(Object):
             refresh_event: an optional bound event or list of bound events which
                 will be observed to re-apply the patch (e.g. on port change).
                 The `install` and `upgrade-charm` events would be observed regardless.
+            update_status_check_interval: minimum number of seconds between two checks of the
+                service on `update-status`. Until it elapses, and as long as the desired ports
+                are unchanged, `update-status` trusts the recorded patch state instead of
+                fetching the service. Only the leader checks the service on `update-status`.
+            lightkube_client: an optional lightkube Client to use for all Kubernetes calls, so
+                that it can be shared with the rest of the charm. If none given, a new Client is
+                created for every operation.
+            server_side_apply: if True, compare every field this library owns (labels,
+                annotations, selector, ports, type and traffic distribution) against the live
+                service and correct any
+                drift with a single server-side apply request, writing nothing when the service
+                is already up to date. Not supported together with a custom `service_name` on a
+                ClusterIP service, which keeps the delete-and-recreate behaviour.
+            traffic_distribution: optional `spec.trafficDistribution` preference for the service,
+                e.g. "PreferClose" to keep traffic within the client's zone when possible.
         """
         logger.warning(
             "The ``kubernetes_service_patch v1`` library is DEPRECATED and will be removed "
@@ -85,6 +116,10 @@ class KubernetesServicePatch(Object):
         if self.service_name == self._app and service_type == "LoadBalancer":
             self.service_name = f"{self._app}-lb"
         self.service_type = service_type
+        self.update_status_check_interval = update_status_check_interval
+        self._lightkube_client = lightkube_client
+        self.server_side_apply = server_side_apply
+        self._stored.set_default(resource_version=None, service_hash=None, last_checked=0.0)
         self.service = self._service_object(
             ports,
             self.service_name,
@@ -92,6 +127,7 @@ class KubernetesServicePatch(Object):
             additional_labels,
             additional_selectors,
             additional_annotations,
+            traffic_distribution,
         )
 
         # Make mypy type checking happy that self._patch is a method
@@ -99,7 +135,7 @@ class KubernetesServicePatch(Object):
         # Ensure this patch is applied during the 'install' and 'upgrade-charm' events
         self.framework.observe(charm.on.install, self._patch)
         self.framework.observe(charm.on.upgrade_charm, self._on_upgrade_charm)
-        self.framework.observe(charm.on.update_status, self._patch)
+        self.framework.observe(charm.on.update_status, self._on_update_status)
         # Sometimes Juju doesn't clean-up a manually created LB service,
         # so we clean it up ourselves just in case.
         self.framework.observe(charm.on.remove, self._remove_service)
@@ -120,6 +156,7 @@ class KubernetesServicePatch(Object):
         additional_labels: Optional[dict] = None,
         additional_selectors: Optional[dict] = None,
         additional_annotations: Optional[dict] = None,
+        traffic_distribution: Optional[str] = None,
     ) -> Service:
         """Creates a valid Service representation.
 
@@ -134,6 +171,7 @@ class KubernetesServicePatch(Object):
             additional_selectors: Selectors to be added to the kubernetes service (by default only
                 "app.kubernetes.io/name" is set to the service name)
             additional_annotations: Annotations to be added to the kubernetes service.
+            traffic_distribution: `spec.trafficDistribution` preference for the service.
 
         Returns:
             Service: A valid representation of a Kubernetes Service with the correct ports.
@@ -159,9 +197,42 @@ class KubernetesServicePatch(Object):
                 selector=selector,
                 ports=ports,
                 type=service_type,
+                trafficDistribution=traffic_distribution,
             ),
         )
 
+    @property
+    def _desired_service_hash(self) -> str:
+        """Hash of the service fields, including the ports, this patch applies."""
+        return hashlib.sha256(
+            json.dumps(self.service.to_dict(), sort_keys=True).encode()
+        ).hexdigest()
+
+    def _record_patch_state(self, service: Service) -> None:
+        """Record the state of the service once it is known to be patched."""
+        self._stored.resource_version = service.metadata.resourceVersion  # type: ignore[attr-defined]
+        self._stored.service_hash = self._desired_service_hash
+        self._stored.last_checked = time.time()
+
+    def _on_update_status(self, event) -> None:
+        """Re-apply the patch on update-status, skipping the check while the recorded state is fresh."""
+        if not self.charm.unit.is_leader():
+            return
+        if (
+            self._stored.resource_version is not None
+            and self._stored.service_hash == self._desired_service_hash
+            and time.time() - self._stored.last_checked < self.update_status_check_interval
+        ):
+            logger.debug("Kubernetes service '%s' recently checked, skipping", self.service_name)
+            return
+        self._patch(event)
+
+    def _client(self) -> Client:
+        """Return the lightkube Client given to this library, or a new one."""
+        if self._lightkube_client is not None:
+            return self._lightkube_client
+        return Client()  # pyright: ignore
+
     def _patch(self, _) -> None:
         """Patch the Kubernetes service created by Juju to map the correct port.
 
@@ -169,12 +240,13 @@ class KubernetesServicePatch(Object):
             PatchFailed: if patching fails due to lack of permissions, or otherwise.
         """
         try:
-            client = Client()  # pyright: ignore
-        except exceptions.ConfigError as e:
-            logger.warning("Error creating k8s client: %s", e)
-            return
-
-        try:
+            client = self._client()
+            if self.server_side_apply and (
+                self.service_name == self._app or self.service_type == "LoadBalancer"
+            ):
+                if self._apply_server_side(client):
+                    logger.info("Kubernetes service '%s' patched successfully", self._app)
+                return
             if self._is_patched(client):
                 return
             if self.service_name != self._app:
@@ -182,7 +254,13 @@ class KubernetesServicePatch(Object):
                     self._delete_and_create_service(client)
                 else:
                     self._create_lb_service(client)
-            client.patch(Service, self.service_name, self.service, patch_type=PatchType.MERGE)
+            service = client.patch(
+                Service, self.service_name, self.service, patch_type=PatchType.MERGE
+            )
+            self._record_patch_state(service)
+        except exceptions.ConfigError as e:
+            # A shared client may only read its config on first use
+            logger.warning("Error creating k8s client: %s", e)
         except ApiError as e:
             if e.status.code == 403:
                 logger.error("Kubernetes service patch failed: `juju trust` this application.")
@@ -191,6 +269,78 @@ class KubernetesServicePatch(Object):
         else:
             logger.info("Kubernetes service '%s' patched successfully", self._app)
 
+    def _apply_server_side(self, client: Client) -> bool:
+        """Correct any drift of the owned service fields in a single request.
+
+        Returns:
+            bool: True if the service was written, False if it was already up to date.
+        """
+        try:
+            live = client.get(Service, name=self.service_name, namespace=self._namespace)
+        except ApiError as e:
+            if e.status.code != 404:
+                raise
+            live = None
+
+        if live is not None and not self._owned_fields_drifted(live):
+            self._record_patch_state(live)
+            return False
+
+        clear_traffic_distribution = (
+            live is not None
+            and self.service.spec.trafficDistribution is None  # type: ignore[union-attr]
+            and live.spec.trafficDistribution is not None  # type: ignore[union-attr]
+        )
+        if clear_traffic_distribution:
+            # Omitting a field from a server-side apply only removes it if this field manager
+            # owns it, which it does not after a merge patch, so clear it with an explicit null.
+            body = self.service.to_dict()
+            body["spec"]["trafficDistribution"] = None
+            service = client.patch(Service, self.service_name, body, patch_type=PatchType.MERGE)
+        elif live is not None and self._has_foreign_ports(live):
+            # Server-side apply cannot drop list entries owned by another field manager, such as
+            # the placeholder port Juju creates, so replace the whole list with a merge patch.
+            service = client.patch(
+                Service, self.service_name, self.service, patch_type=PatchType.MERGE
+            )
+        else:
+            service = client.apply(self.service, field_manager=self._app, force=True)
+        self._record_patch_state(service)
+        return True
+
+    def _owned_fields_drifted(self, live: Service) -> bool:
+        """Report whether any field this library owns differs on the live service."""
+        desired_meta, live_meta = self.service.metadata, live.metadata
+        desired_spec, live_spec = self.service.spec, live.spec
+        if live_meta is None or live_spec is None:
+            return True
+        if not _is_subset(desired_meta.labels, live_meta.labels):  # type: ignore[union-attr]
+            return True
+        if not _is_subset(desired_meta.annotations, live_meta.annotations):  # type: ignore[union-attr]
+            return True
+        if (desired_spec.selector or {}) != (live_spec.selector or {}):  # type: ignore[union-attr]
+            return True
+        if desired_spec.type != live_spec.type:  # type: ignore[union-attr]
+            return True
+        if desired_spec.trafficDistribution != live_spec.trafficDistribution:  # type: ignore[union-attr]
+            return True
+        desired_ports = desired_spec.ports or []  # type: ignore[union-attr]
+        live_ports = live_spec.ports or []
+        if len(desired_ports) != len(live_ports):
+            return True
+        return not all(
+            _is_subset(desired.to_dict(), current.to_dict())
+            for desired, current in zip(desired_ports, live_ports)
+        )
+
+    def _has_foreign_ports(self, live: Service) -> bool:
+        """Report whether the live service has ports this library does not declare."""
+        desired = {(p.port, p.protocol or "TCP") for p in self.service.spec.ports}  # type: ignore[union-attr]
+        return any(
+            (p.port, p.protocol or "TCP") not in desired
+            for p in (live.spec.ports or [])  # type: ignore[union-attr]
+        )
+
     def _delete_and_create_service(self, client: Client):
         service = client.get(Service, self._app, namespace=self._namespace)
         service.metadata.name = self.service_name  # type: ignore[attr-defined]
@@ -204,14 +354,21 @@ class KubernetesServicePatch(Object):
         except ApiError:
             client.create(self.service)
 
+    def is_patch_recorded(self) -> bool:
+        """Report whether the desired service was last recorded as patched, without any API call.
+
+        Returns:
+            bool: True if the last successful patch or check applied the current desired service.
+        """
+        return self._stored.service_hash == self._desired_service_hash
+
     def is_patched(self) -> bool:
         """Reports if the service patch has been applied.
 
         Returns:
             bool: A boolean indicating if the service patch has been applied.
         """
-        client = Client()  # pyright: ignore
-        return self._is_patched(client)
+        return self._is_patched(self._client())
 
     def _is_patched(self, client: Client) -> bool:
         # Get the relevant service from the cluster
@@ -229,14 +386,17 @@ class KubernetesServicePatch(Object):
         fetched_ports = [
             (p.port, p.targetPort) for p in service.spec.ports  # type: ignore[attr-defined]
         ]  # noqa: E501
-        return expected_ports == fetched_ports
+        if expected_ports != fetched_ports:
+            return False
+        self._record_patch_state(service)
+        return True
 
     def _on_upgrade_charm(self, event: UpgradeCharmEvent):
         """Handle the upgrade charm event."""
         # If a charm author changed the service type from LB to ClusterIP across an upgrade, we need to delete the previous LB.
         if self.service_type == "ClusterIP":
 
-            client = Client()  # pyright: ignore
+            client = self._client()
 
             # Define a label selector to find services related to the app
             selector: dict[str, Any] = {"app.kubernetes.io/name": self._app}
@@ -273,7 +433,7 @@ class KubernetesServicePatch(Object):
         Raises:
             ApiError: for deletion errors, excluding when the service is not found (404 Not Found).
         """
-        client = Client()  # pyright: ignore
+        client = self._client()
 
         try:
             client.delete(Service, self.service_name, namespace=self._namespace)
@@ -303,3 +463,9 @@ class KubernetesServicePatch(Object):
         """
         with open("/var/run/secrets/kubernetes.io/serviceaccount/namespace", "r") as f:
             return f.read().strip()
+
+
+def _is_subset(desired: Optional[dict], live: Optional[dict]) -> bool:
+    """Return True if every key of `desired` has the same value in `live`."""
+    live = live or {}
+    return all(live.get(key) == value for key, value in (desired or {}).items())
@@ -5,6 +5,7 @@
 import logging
 from random import choices
 from string import ascii_uppercase, digits
+from typing import Optional
 
 from charmed_kubeflow_chisme.exceptions import ErrorWithStatus
 from charmed_kubeflow_chisme.pebble import update_layer
@@ -24,32 +25,51 @@ from charms.istio_ingress_k8s.v0.istio_ingress_route import (
     IstioIngressRouteRequirer,
     Listener,
     ProtocolType,
+    serialize_config,
 )
 from charms.loki_k8s.v1.loki_push_api import LogForwarder
 from charms.oauth2_proxy_k8s.v0.forward_auth import ForwardAuthConfig, ForwardAuthProvider
 from charms.observability_libs.v1.kubernetes_service_patch import KubernetesServicePatch
+from lightkube import ApiError
 from lightkube.models.core_v1 import ServicePort
+from lightkube.resources.apps_v1 import StatefulSet
+from lightkube.types import PatchType
 from ops import main
 from ops.charm import CharmBase
+from ops.framework import StoredState
 from ops.model import ActiveStatus, BlockedStatus, WaitingStatus
 from ops.pebble import Layer
 from serialized_data_interface import NoCompatibleVersions, NoVersionsListed, get_interfaces
 
+from kubernetes_client import SharedKubernetesClient
+
 OIDC_PROVIDER_INFO_RELATION = "dex-oidc-config"
+TOPOLOGY_MODE_ANNOTATION = "service.kubernetes.io/topology-mode"
+LOG_LEVELS = ("debug", "info", "warn", "error")
+TRAFFIC_DISTRIBUTIONS = ("PreferClose", "PreferSameZone", "PreferSameNode")
 
 
 class OIDCGatekeeperOperator(CharmBase):
     """Charm OIDC Gatekeeper Operator."""
 
     _http_port = 8080
+    _stored = StoredState()
 
     def __init__(self, *args):
         super().__init__(*args)
+        # The serialized istio-ingress-route config only changes with the charm revision
+        self._stored.set_default(
+            zone_spread_applied=False, topology_mode_applied=False, ingress_route_config=None
+        )
 
         self.logger = logging.getLogger(__name__)
         self._container_name = "oidc-authservice"
         self._container = self.unit.get_container(self._container_name)
         self.pebble_service_name = "oidc-authservice"
+        # One lazily created Kubernetes client, shared by every library talking to the cluster
+        self._lightkube_client = SharedKubernetesClient(
+            namespace=self.model.name, field_manager=self.app.name
+        )
         self._dex_oidc_config_requirer = DexOidcConfigRequirer(
             charm=self,
             relation_name=OIDC_PROVIDER_INFO_RELATION,
@@ -59,14 +79,23 @@ class OIDCGatekeeperOperator(CharmBase):
         self.service_patcher = KubernetesServicePatch(
             self,
             [http_service_port],
+            additional_annotations=self._service_annotations,
+            refresh_event=self.on.config_changed,
+            lightkube_client=self._lightkube_client,
+            server_side_apply=True,
+            traffic_distribution=self._traffic_distribution,
         )
+        # Observed after the Service patch, so it sees whether this event's patch succeeded
+        for event in [self.on.config_changed, self.on.update_status]:
+            self.framework.observe(event, self._record_topology_mode)
 
         # Ambient Mesh integration
-        self._mesh = ServiceMeshConsumer(self)
+        self._mesh = ServiceMeshConsumer(self, lightkube_client=self._lightkube_client)
         self.ingress_unauthenticated = IstioIngressRouteRequirer(
             self, relation_name="istio-ingress-route-unauthenticated"
         )
         self._ambient_mesh_ingress()
+        self.framework.observe(self.on.upgrade_charm, self._on_upgrade_charm_refresh_ingress)
 
         # Makes AuthService an external authorizer for Istio. This relation
         # will end up doing the following:
@@ -84,6 +113,9 @@ class OIDCGatekeeperOperator(CharmBase):
                 headers=["kubeflow-userid"],
             ),
         )
+        # Protect the allow-listed apps the forward-auth requirer routes through ingress
+        for event in [self.on.config_changed, self.on["forward-auth"].relation_changed]:
+            self.framework.observe(event, self._protect_ingress_apps)
 
         for event in [
             self.on.start,
@@ -95,8 +127,8 @@ class OIDCGatekeeperOperator(CharmBase):
             self.on["ingress-auth"].relation_changed,
             self.on["oidc-client"].relation_changed,
             self.on["client-secret"].relation_changed,
-            self.on[OIDC_PROVIDER_INFO_RELATION].relation_changed,
-            self.on[OIDC_PROVIDER_INFO_RELATION].relation_broken,
+            # Emitted on dex-oidc-config relation-broken and on relation-changed, but only if
+            # the Dex OIDC config changed
             self._dex_oidc_config_requirer.on.updated,
         ]:
             self.framework.observe(event, self.main)
@@ -107,22 +139,64 @@ class OIDCGatekeeperOperator(CharmBase):
         try:
             self._check_leader()
             self._check_dex_oidc_config_relation()
+            self._check_log_level()
+            self._check_traffic_distribution()
             interfaces = self._get_interfaces()
             secret_key = self._check_secret()
             self._send_info(interfaces, secret_key)
             self._configure_mesh(interfaces)
+            self._configure_zone_spread()
             update_layer(self._container_name, self._container, self._oidc_layer, self.logger)
         except ErrorWithStatus as err:
             self.model.unit.status = err.status
             self.logger.error(f"Failed to handle {event} with error: {err}")
             return
 
+        # Checked last, as the service-mesh relation is optional and must not stop the rest
+        # of the charm from being configured
+        try:
+            self._check_service_mesh_relation()
+        except ErrorWithStatus as err:
+            self.model.unit.status = err.status
+            self.logger.error(f"Handled {event} with error: {err}")
+            return
+
         self.model.unit.status = ActiveStatus()
 
+    def _protect_ingress_apps(self, _):
+        """Publish only the changes between the protected apps and the allow-listed ingress apps.
+
+        Only apps listed in the forward-auth-apps config are protected, so the identity provider
+        and any other app routed through ingress stay reachable unless explicitly listed.
+        """
+        if not self.unit.is_leader():
+            return
+        allowed_app_names = {
+            app.strip() for app in self.model.config["forward-auth-apps"].split(",") if app.strip()
+        }
+        wanted_app_names = allowed_app_names & self.forward_auth.ingress_app_names
+        protected_app_names = set(self.forward_auth.app_names)
+        self.forward_auth.add_app_names(wanted_app_names - protected_app_names)
+        self.forward_auth.remove_app_names(protected_app_names - wanted_app_names)
+
     def _ambient_mesh_ingress(self):
+        # Only submit config if we are a leader
+        if not self.unit.is_leader():
+            return
+        if self._stored.ingress_route_config is None:
+            self._stored.ingress_route_config = serialize_config(self._ingress_route_config())
+        self.ingress_unauthenticated.submit_serialized_config(self._stored.ingress_route_config)
+
+    def _on_upgrade_charm_refresh_ingress(self, _):
+        """Rebuild the cached ingress route config, which may have changed with the charm."""
+        self._stored.ingress_route_config = None
+        self._ambient_mesh_ingress()
+
+    def _ingress_route_config(self) -> IstioIngressRouteConfig:
+        """Return the istio-ingress-route config for the authservice."""
         http_listener = Listener(port=80, protocol=ProtocolType.HTTP)
 
-        config = IstioIngressRouteConfig(
+        return IstioIngressRouteConfig(
             model=self.model.name,
             listeners=[http_listener],
             http_routes=[
@@ -141,14 +215,118 @@ class OIDCGatekeeperOperator(CharmBase):
             ],
         )
 
-        # Only submit config if we are a leader
-        if self.unit.is_leader():
-            self.ingress_unauthenticated.submit_config(config)
+    @property
+    def _service_annotations(self) -> dict:
+        """Return the annotations of the authservice Kubernetes Service."""
+        if self.model.config["topology-aware-routing"]:
+            return {TOPOLOGY_MODE_ANNOTATION: "Auto"}
+        if self._stored.topology_mode_applied:
+            # The Service patch never removes annotations, so turn the option off explicitly
+            return {TOPOLOGY_MODE_ANNOTATION: "Disabled"}
+        return {}
+
+    def _record_topology_mode(self, _):
+        """Remember topology-aware routing was enabled, once the Service patch has applied it."""
+        if (
+            self.model.config["topology-aware-routing"]
+            and self.service_patcher.is_patch_recorded()
+        ):
+            self._stored.topology_mode_applied = True
+
+    @property
+    def _traffic_distribution(self) -> Optional[str]:
+        """Return the traffic distribution of the authservice Kubernetes Service, if valid.
+
+        An invalid value would make the API server reject the whole Service patch, so it is
+        left out here and reported by `_check_traffic_distribution`.
+        """
+        traffic_distribution = self.model.config["traffic-distribution"] or None
+        if traffic_distribution not in (None, *TRAFFIC_DISTRIBUTIONS):
+            return None
+        return traffic_distribution
+
+    def _configure_zone_spread(self) -> None:
+        """Spread the authservice pods across zones when enabled and scaled out.
+
+        Raises:
+            ErrorWithStatus: if the StatefulSet could not be read or patched
+        """
+        enabled = self.model.config["zone-spread"] and self.app.planned_units() > 1
+        if not enabled and not self._stored.zone_spread_applied:
+            return
+
+        constraints = (
+            [
+                {
+                    "maxSkew": 1,
+                    "topologyKey": "topology.kubernetes.io/zone",
+                    "whenUnsatisfiable": "ScheduleAnyway",
+                    "labelSelector": {"matchLabels": {"app.kubernetes.io/name": self.app.name}},
+                }
+            ]
+            if enabled
+            else None
+        )
+        try:
+            stateful_set = self._lightkube_client.get(StatefulSet, name=self.app.name)
+            current = stateful_set.spec.template.spec.topologySpreadConstraints
+            if [c.to_dict() for c in current or []] != (constraints or []):
+                self._lightkube_client.patch(
+                    StatefulSet,
+                    name=self.app.name,
+                    obj={
+                        "spec": {"template": {"spec": {"topologySpreadConstraints": constraints}}}
+                    },
+                    patch_type=PatchType.MERGE,
+                )
+        except ApiError as err:
+            raise ErrorWithStatus(
+                f"Failed to configure zone spread, `juju trust` this application: {err}",
+                BlockedStatus,
+            )
+        self._stored.zone_spread_applied = bool(enabled)
 
     @property
     def _service_url(self) -> str:
         return f"http://{self.app.name}.{self.model.name}.svc.cluster.local:{self._http_port}"
 
+    def _check_service_mesh_relation(self) -> None:
+        """Raise ErrorWithStatus if the service-mesh provider sent invalid data.
+
+        Raises:
+            ErrorWithStatus: if the service-mesh relation data is invalid, set unit to
+                BlockedStatus
+        """
+        if self._mesh.provider_app_data_error():
+            raise ErrorWithStatus(
+                "Invalid data in service-mesh relation, see debug-log for details.", BlockedStatus
+            )
+
+    def _check_log_level(self) -> None:
+        """Raise ErrorWithStatus if the log-level config is not a supported level.
+
+        Raises:
+            ErrorWithStatus: if log-level is invalid, set unit to BlockedStatus
+        """
+        if self.model.config["log-level"].lower() not in LOG_LEVELS:
+            raise ErrorWithStatus(
+                f"Invalid log-level, expected one of {', '.join(LOG_LEVELS)}.", BlockedStatus
+            )
+
+    def _check_traffic_distribution(self) -> None:
+        """Raise ErrorWithStatus if the traffic-distribution config is not supported.
+
+        Raises:
+            ErrorWithStatus: if traffic-distribution is invalid, set unit to BlockedStatus
+        """
+        traffic_distribution = self.model.config["traffic-distribution"]
+        if traffic_distribution and traffic_distribution not in TRAFFIC_DISTRIBUTIONS:
+            raise ErrorWithStatus(
+                "Invalid traffic-distribution, expected one of "
+                f"{', '.join(TRAFFIC_DISTRIBUTIONS)}.",
+                BlockedStatus,
+            )
+
     def _check_dex_oidc_config_relation(self) -> None:
         """Check for exceptions from the library and raises ErrorWithStatus to set the unit status.
 
@@ -195,6 +373,7 @@ class OIDCGatekeeperOperator(CharmBase):
             # Added to fix https://github.com/canonical/oidc-gatekeeper-operator/issues/64
             "OIDC_STATE_STORE_PATH": "oidc_state.db",
             "SKIP_AUTH_URLS": dex_skip_urls,
+            "LOG_LEVEL": self.model.config["log-level"].upper(),
         }
 
         if self.model.config["ca-bundle"]:
@@ -0,0 +1,34 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""A lazily created lightkube Client shared by the charm and the charm libraries it uses."""
+
+from typing import Optional
+
+from lightkube import Client
+
+
+class SharedKubernetesClient:
+    """Lazily create one lightkube Client and share its connection pool between callers.
+
+    Instances stand in for a lightkube Client: any Client attribute accessed on them is forwarded
+    to a single underlying Client, created on first use with a fixed namespace and field manager.
+    Reading the in-cluster config and service account token, and opening connections to the API
+    server, therefore happens at most once per dispatch however many libraries use the client.
+    """
+
+    def __init__(self, namespace: str, field_manager: str):
+        self._namespace = namespace
+        self._field_manager = field_manager
+        self._client: Optional[Client] = None
+
+    @property
+    def client(self) -> Client:
+        """Return the underlying lightkube Client, creating it on first use."""
+        if self._client is None:
+            self._client = Client(namespace=self._namespace, field_manager=self._field_manager)
+        return self._client
+
+    def __getattr__(self, name):
+        """Forward attribute access to the underlying Client."""
+        return getattr(self.client, name)
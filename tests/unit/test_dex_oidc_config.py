@@ -0,0 +1,82 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+import pytest
+from charms.dex_auth.v0.dex_oidc_config import DexOidcConfigRequirer
+from ops.charm import CharmBase
+from ops.testing import Harness
+
+METADATA = """
+name: dex-oidc-config-tester
+requires:
+  dex-oidc-config:
+    interface: dex-oidc-config
+"""
+
+
+class DexOidcConfigTesterCharm(CharmBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.dex = DexOidcConfigRequirer(self, relation_name="dex-oidc-config")
+        self.events = []
+        self.framework.observe(self.dex.on.updated, self._record)
+
+    def _record(self, event):
+        self.events.append(event)
+
+
+@pytest.fixture
+def harness():
+    harness = Harness(DexOidcConfigTesterCharm, meta=METADATA)
+    harness.begin()
+    yield harness
+    harness.cleanup()
+
+
+def _relate_dex(harness):
+    rel_id = harness.add_relation("dex-oidc-config", "dex-auth")
+    harness.add_relation_unit(rel_id, "dex-auth/0")
+    harness.update_relation_data(rel_id, "dex-auth", {"issuer-url": "http://dex.io/dex"})
+    return rel_id
+
+
+def test_updated_is_emitted_with_old_and_new_data(harness):
+    rel_id = _relate_dex(harness)
+
+    harness.update_relation_data(rel_id, "dex-auth", {"issuer-url": "http://dex.example/dex"})
+
+    first, second = harness.charm.events
+    assert (first.old_data, first.new_data) == ({}, {"issuer-url": "http://dex.io/dex"})
+    assert second.old_data == {"issuer-url": "http://dex.io/dex"}
+    assert second.new_data == {"issuer-url": "http://dex.example/dex"}
+
+
+def test_updated_is_not_emitted_when_data_is_unchanged(harness):
+    rel_id = _relate_dex(harness)
+    harness.charm.events.clear()
+
+    # A relation-changed from a unit databag does not change the provider data
+    harness.update_relation_data(rel_id, "dex-auth/0", {"ingress-address": "10.0.0.1"})
+
+    assert harness.charm.events == []
+
+
+def test_updated_is_emitted_on_relation_broken(harness):
+    rel_id = _relate_dex(harness)
+    harness.charm.events.clear()
+
+    harness.remove_relation(rel_id)
+
+    (event,) = harness.charm.events
+    assert (event.old_data, event.new_data) == ({"issuer-url": "http://dex.io/dex"}, {})
+
+
+def test_get_data_is_cached_until_data_changes(harness):
+    rel_id = _relate_dex(harness)
+
+    data = harness.charm.dex.get_data()
+    assert harness.charm.dex.get_data() is data
+
+    harness.update_relation_data(rel_id, "dex-auth", {"issuer-url": "http://dex.example/dex"})
+
+    assert harness.charm.dex.get_data() is not data
+    assert harness.charm.dex.get_data().issuer_url == "http://dex.example/dex"
@@ -0,0 +1,234 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+import json
+from unittest.mock import patch
+
+import pytest
+from charms.oauth2_proxy_k8s.v0 import forward_auth
+from charms.oauth2_proxy_k8s.v0.forward_auth import (
+    FORWARD_AUTH_PROVIDER_JSON_SCHEMA,
+    DataValidationError,
+    ForwardAuthConfig,
+    ForwardAuthProvider,
+    ForwardAuthProxySet,
+    InvalidForwardAuthConfigEvent,
+    _dump_data,
+    _validate_data,
+)
+from ops.charm import CharmBase
+from ops.testing import Harness
+
+METADATA = """
+name: forward-auth-tester
+provides:
+  forward-auth:
+    interface: forward_auth
+"""
+
+CONFIG = ForwardAuthConfig(
+    decisions_address="http://oidc-gatekeeper.kubeflow.svc.cluster.local:8080",
+    app_names=[f"app-{i}" for i in range(50)],
+    headers=["kubeflow-userid"],
+)
+
+
+class ForwardAuthTesterCharm(CharmBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.forward_auth = ForwardAuthProvider(self, forward_auth_config=CONFIG)
+
+
+@pytest.fixture(autouse=True)
+def validated_digests():
+    forward_auth._VALIDATED_DIGESTS.clear()
+    yield forward_auth._VALIDATED_DIGESTS
+    forward_auth._VALIDATED_DIGESTS.clear()
+
+
+@pytest.fixture
+def harness():
+    harness = Harness(ForwardAuthTesterCharm, meta=METADATA)
+    harness.set_leader(True)
+    harness.begin()
+    yield harness
+    harness.cleanup()
+
+
+def test_schemas_are_compiled_at_import():
+    validator = forward_auth._get_validator(FORWARD_AUTH_PROVIDER_JSON_SCHEMA)
+
+    with patch.object(type(validator), "check_schema") as check_schema:
+        assert forward_auth._get_validator(FORWARD_AUTH_PROVIDER_JSON_SCHEMA) is validator
+        check_schema.assert_not_called()
+
+
+def test_unchanged_payload_is_validated_once(harness):
+    validator = forward_auth._get_validator(FORWARD_AUTH_PROVIDER_JSON_SCHEMA)
+
+    with patch.object(validator, "validate", wraps=validator.validate) as validate:
+        for i in range(3):
+            harness.add_relation("forward-auth", f"traefik-{i}")
+
+    validate.assert_called_once()
+    relation = harness.model.relations["forward-auth"][0]
+    assert relation.data[harness.charm.app]["decisions_address"] == CONFIG.decisions_address
+
+
+def test_invalid_payload_is_not_cached(validated_digests):
+    invalid = {"decisions_address": 1, "app_names": []}
+
+    for _ in range(2):
+        with pytest.raises(DataValidationError):
+            _validate_data(invalid, FORWARD_AUTH_PROVIDER_JSON_SCHEMA)
+
+    assert validated_digests == {}
+
+
+def test_changed_payload_is_validated_again():
+    _dump_data(CONFIG.to_dict(), FORWARD_AUTH_PROVIDER_JSON_SCHEMA)
+
+    with pytest.raises(DataValidationError):
+        _dump_data({**CONFIG.to_dict(), "app_names": "app-0"}, FORWARD_AUTH_PROVIDER_JSON_SCHEMA)
+
+
+class ForwardAuthEventsTesterCharm(ForwardAuthTesterCharm):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.events = []
+        self.framework.observe(self.forward_auth.on.forward_auth_proxy_set, self._record)
+        self.framework.observe(self.forward_auth.on.invalid_forward_auth_config, self._record)
+
+    def _record(self, event):
+        self.events.append(event)
+
+
+@pytest.fixture
+def events_harness():
+    harness = Harness(ForwardAuthEventsTesterCharm, meta=METADATA)
+    harness.set_leader(True)
+    harness.begin()
+    yield harness
+    harness.cleanup()
+
+
+def _relate_ingress_apps(harness, ingress_app_names):
+    rel_id = harness.add_relation("forward-auth", "traefik")
+    harness.add_relation_unit(rel_id, "traefik/0")
+    harness.update_relation_data(
+        rel_id, "traefik", {"ingress_app_names": json.dumps(ingress_app_names)}
+    )
+
+
+def test_all_apps_related_via_ingress_emit_one_event(events_harness):
+    _relate_ingress_apps(events_harness, CONFIG.app_names + ["other-app"])
+
+    (event,) = events_harness.charm.events
+    assert isinstance(event, ForwardAuthProxySet)
+    assert event.valid_apps == set(CONFIG.app_names)
+
+
+def test_apps_not_related_via_ingress_emit_one_aggregated_event(events_harness):
+    # "app-1" is a substring of the related "app-10", but must not match it
+    _relate_ingress_apps(
+        events_harness, [app for app in CONFIG.app_names if app not in ("app-1", "app-2")]
+    )
+
+    (event,) = events_harness.charm.events
+    assert isinstance(event, InvalidForwardAuthConfigEvent)
+    assert event.invalid_apps == {"app-1", "app-2"}
+    assert event.valid_apps == set(CONFIG.app_names) - {"app-1", "app-2"}
+    assert event.error == "app-1, app-2 not related via ingress"
+
+
+def _provider_databag(harness):
+    relation = harness.model.relations["forward-auth"][0]
+    return relation.data[harness.charm.app]
+
+
+def test_add_and_remove_app_names_publish_deltas(harness):
+    harness.add_relation("forward-auth", "traefik")
+    databag = _provider_databag(harness)
+
+    harness.charm.forward_auth.add_app_names(["new-app", "app-0"])
+
+    assert json.loads(databag["app_names"]) == sorted(CONFIG.app_names + ["new-app"])
+    assert json.loads(databag["runtime_app_names"]) == ["app-0", "new-app"]
+
+    # Configured apps stay protected when removed at runtime
+    harness.charm.forward_auth.remove_app_names(["new-app", "app-0"])
+
+    assert json.loads(databag["app_names"]) == sorted(CONFIG.app_names)
+    assert json.loads(databag["runtime_app_names"]) == []
+
+
+def test_unchanged_app_names_are_not_published(harness):
+    harness.add_relation("forward-auth", "traefik")
+    harness.charm.forward_auth.add_app_names(["new-app"])
+
+    with patch.object(ForwardAuthProvider, "_publish_app_names") as publish:
+        harness.charm.forward_auth.add_app_names(["new-app"])
+        harness.charm.forward_auth.remove_app_names(["unknown-app"])
+
+    publish.assert_not_called()
+
+
+def test_runtime_app_names_survive_a_leader_change(harness):
+    rel_id = harness.add_relation("forward-auth", "traefik")
+    # Published by a previous leader, whose unit state this unit does not have
+    with harness.hooks_disabled():
+        harness.update_relation_data(
+            rel_id,
+            harness.charm.app.name,
+            {
+                "app_names": json.dumps(sorted(CONFIG.app_names + ["new-app"])),
+                "runtime_app_names": json.dumps(["new-app"]),
+            },
+        )
+
+    harness.charm.forward_auth.update_forward_auth_config(CONFIG)
+    harness.charm.forward_auth.add_app_names(["other-app"])
+
+    assert harness.charm.forward_auth._runtime_app_names() == {"new-app", "other-app"}
+
+
+def test_apps_dropped_from_config_are_unprotected(harness):
+    harness.add_relation("forward-auth", "traefik")
+    harness.charm.forward_auth.add_app_names(["new-app"])
+
+    harness.charm.forward_auth.update_forward_auth_config(
+        ForwardAuthConfig(
+            decisions_address=CONFIG.decisions_address,
+            app_names=["app-0"],
+            headers=CONFIG.headers,
+        )
+    )
+
+    assert json.loads(_provider_databag(harness)["app_names"]) == ["app-0", "new-app"]
+
+
+def test_non_leader_does_not_publish_app_names(harness):
+    harness.add_relation("forward-auth", "traefik")
+    harness.set_leader(False)
+
+    with patch.object(ForwardAuthProvider, "_publish_app_names") as publish:
+        harness.charm.forward_auth.add_app_names(["new-app"])
+
+    publish.assert_not_called()
+
+
+def test_apps_dropped_from_config_across_an_upgrade_are_unprotected(harness):
+    harness.add_relation("forward-auth", "traefik")
+    harness.charm.forward_auth.add_app_names(["new-app"])
+
+    # The upgraded charm constructs the provider with fewer configured apps
+    harness.charm.forward_auth.forward_auth_config = ForwardAuthConfig(
+        decisions_address=CONFIG.decisions_address, app_names=["app-0"], headers=CONFIG.headers
+    )
+    harness.charm.forward_auth.add_app_names(["other-app"])
+
+    assert harness.charm.forward_auth.app_names == ["app-0", "new-app", "other-app"]
+    assert json.loads(_provider_databag(harness)["app_names"]) == [
+        "app-0",
+        "new-app",
+        "other-app",
+    ]
@@ -0,0 +1,80 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+from unittest.mock import patch
+
+import pytest
+from charms.istio_ingress_k8s.v0.istio_ingress_route import IstioIngressRouteRequirer
+from ops.charm import CharmBase
+from ops.testing import Harness
+
+METADATA = """
+name: route-tester
+requires:
+  ingress:
+    interface: istio_ingress_route
+"""
+
+
+class RouteTesterCharm(CharmBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.ingress = IstioIngressRouteRequirer(self, relation_name="ingress")
+
+
+@pytest.fixture
+def harness():
+    harness = Harness(RouteTesterCharm, meta=METADATA)
+    harness.set_leader(True)
+    yield harness
+    harness.cleanup()
+
+
+def _add_ingress_relations(harness, count):
+    return [
+        harness.add_relation(
+            "ingress",
+            f"istio-ingress-{i}",
+            app_data={"external_host": f"10.0.0.{i}", "tls_enabled": "True"},
+        )
+        for i in range(count)
+    ]
+
+
+def test_remote_state_is_read_once_per_dispatch(harness):
+    _add_ingress_relations(harness, 3)
+    harness.begin()
+
+    with patch.object(
+        IstioIngressRouteRequirer,
+        "_read_remote_state",
+        wraps=harness.charm.ingress._read_remote_state,
+    ) as read:
+        assert harness.charm.ingress.external_host == "10.0.0.2"
+        assert harness.charm.ingress.tls_enabled is True
+        assert harness.charm.ingress.external_host == "10.0.0.2"
+        read.assert_called_once()
+
+
+def test_relation_changed_refreshes_state(harness):
+    (rel_id,) = _add_ingress_relations(harness, 1)
+    harness.begin()
+    assert harness.charm.ingress.external_host == "10.0.0.0"
+
+    harness.update_relation_data(
+        rel_id, "istio-ingress-0", {"external_host": "ingress.example.com", "tls_enabled": "False"}
+    )
+
+    assert harness.charm.ingress.external_host == "ingress.example.com"
+    assert harness.charm.ingress.tls_enabled is False
+
+
+def test_stored_state_is_not_written_when_unchanged(harness):
+    _add_ingress_relations(harness, 1)
+    harness.begin()
+    harness.charm.ingress._stored.external_host = "10.0.0.0"
+    harness.charm.ingress._stored.tls_enabled = True
+    harness.charm.ingress._stored._data.dirty = False
+
+    assert harness.charm.ingress.external_host == "10.0.0.0"
+
+    assert harness.charm.ingress._stored._data.dirty is False
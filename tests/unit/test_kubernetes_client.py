@@ -0,0 +1,20 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+from unittest.mock import MagicMock, patch
+
+from kubernetes_client import SharedKubernetesClient
+
+
+@patch("kubernetes_client.Client")
+def test_client_is_created_lazily_once(mocked_client):
+    shared = SharedKubernetesClient(namespace="kubeflow", field_manager="oidc-gatekeeper")
+    mocked_client.assert_not_called()
+
+    shared.get("Service", "oidc-gatekeeper")
+    shared.patch("StatefulSet", "oidc-gatekeeper", obj=MagicMock())
+    shared.list("AuthorizationPolicy")
+
+    mocked_client.assert_called_once_with(namespace="kubeflow", field_manager="oidc-gatekeeper")
+    client = mocked_client.return_value
+    client.get.assert_called_once_with("Service", "oidc-gatekeeper")
+    client.list.assert_called_once_with("AuthorizationPolicy")
@@ -0,0 +1,220 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import httpx
+import pytest
+from charms.observability_libs.v1.kubernetes_service_patch import KubernetesServicePatch
+from lightkube import ApiError
+from lightkube.models.core_v1 import ServicePort, ServiceSpec
+from lightkube.models.meta_v1 import ObjectMeta
+from lightkube.resources.core_v1 import Service
+from ops.charm import CharmBase
+from ops.testing import Harness
+
+METADATA = """
+name: patch-tester
+"""
+
+LIB = "charms.observability_libs.v1.kubernetes_service_patch"
+
+
+class PatchTesterCharm(CharmBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.service_patcher = KubernetesServicePatch(
+            self, [ServicePort(8080, name="http-port")], update_status_check_interval=600
+        )
+
+
+def _service(resource_version="1", port=8080):
+    return Service(
+        metadata=ObjectMeta(name="patch-tester", resourceVersion=resource_version),
+        spec=ServiceSpec(ports=[ServicePort(port, name="http-port")]),
+    )
+
+
+@pytest.fixture
+def client():
+    client = MagicMock()
+    client.get.return_value = _service()
+    client.patch.return_value = _service(resource_version="2")
+    with patch(f"{LIB}.Client", return_value=client):
+        yield client
+
+
+@pytest.fixture
+def harness(client):
+    with patch(f"{LIB}.KubernetesServicePatch._namespace", new_callable=PropertyMock) as ns:
+        ns.return_value = "kubeflow"
+        harness = Harness(PatchTesterCharm, meta=METADATA)
+        harness.set_leader(True)
+        yield harness
+        harness.cleanup()
+
+
+def test_update_status_skips_get_while_patch_state_is_fresh(harness, client):
+    harness.begin()
+    harness.charm.on.install.emit()
+    assert client.get.call_count == 1
+
+    harness.charm.on.update_status.emit()
+
+    assert client.get.call_count == 1
+    assert harness.charm.service_patcher._stored.resource_version == "1"
+
+
+def test_update_status_checks_after_interval(harness, client):
+    harness.begin()
+    harness.charm.on.install.emit()
+
+    with patch(
+        f"{LIB}.time.time", return_value=harness.charm.service_patcher._stored.last_checked + 601
+    ):
+        harness.charm.on.update_status.emit()
+
+    assert client.get.call_count == 2
+
+
+def test_update_status_checks_when_desired_ports_change(harness, client):
+    harness.begin()
+    harness.charm.on.install.emit()
+    harness.charm.service_patcher.service.spec.ports = [ServicePort(9090, name="http-port")]
+
+    harness.charm.on.update_status.emit()
+
+    assert client.get.call_count == 2
+    client.patch.assert_called_once()
+    assert harness.charm.service_patcher._stored.resource_version == "2"
+
+
+def test_update_status_is_leader_only(harness, client):
+    harness.set_leader(False)
+    harness.begin()
+
+    harness.charm.on.update_status.emit()
+
+    client.get.assert_not_called()
+
+
+class SSAPatchTesterCharm(CharmBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.service_patcher = KubernetesServicePatch(
+            self,
+            [ServicePort(8080, name="http-port")],
+            additional_labels={"team": "auth"},
+            server_side_apply=True,
+        )
+
+
+def _live_service(labels=None, ports=None, traffic_distribution=None):
+    return Service(
+        metadata=ObjectMeta(
+            name="patch-tester",
+            resourceVersion="1",
+            labels={"app.kubernetes.io/name": "patch-tester", "team": "auth", **(labels or {})},
+        ),
+        spec=ServiceSpec(
+            selector={"app.kubernetes.io/name": "patch-tester"},
+            type="ClusterIP",
+            ports=ports or [ServicePort(8080, name="http-port", protocol="TCP", targetPort=8080)],
+            trafficDistribution=traffic_distribution,
+        ),
+    )
+
+
+@pytest.fixture
+def ssa_harness(client):
+    with patch(f"{LIB}.KubernetesServicePatch._namespace", new_callable=PropertyMock) as ns:
+        ns.return_value = "kubeflow"
+        harness = Harness(SSAPatchTesterCharm, meta=METADATA)
+        harness.set_leader(True)
+        yield harness
+        harness.cleanup()
+
+
+def test_server_side_apply_writes_nothing_when_up_to_date(ssa_harness, client):
+    client.get.return_value = _live_service()
+    ssa_harness.begin()
+
+    ssa_harness.charm.on.install.emit()
+
+    client.apply.assert_not_called()
+    client.patch.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "live",
+    (
+        _live_service(labels={"team": "other"}),
+        _live_service(ports=[ServicePort(8080, name="renamed", protocol="TCP")]),
+    ),
+)
+def test_server_side_apply_corrects_drift_in_one_request(ssa_harness, client, live):
+    client.get.return_value = live
+    client.apply.return_value = _live_service()
+    ssa_harness.begin()
+
+    ssa_harness.charm.on.install.emit()
+
+    client.apply.assert_called_once_with(
+        ssa_harness.charm.service_patcher.service, field_manager="patch-tester", force=True
+    )
+    client.patch.assert_not_called()
+
+
+def test_server_side_apply_replaces_foreign_ports(ssa_harness, client):
+    client.get.return_value = _live_service(
+        ports=[
+            ServicePort(8080, name="http-port", protocol="TCP"),
+            ServicePort(65535, name="placeholder", protocol="TCP"),
+        ]
+    )
+    ssa_harness.begin()
+
+    ssa_harness.charm.on.install.emit()
+
+    client.apply.assert_not_called()
+    client.patch.assert_called_once()
+
+
+def test_server_side_apply_clears_traffic_distribution(ssa_harness, client):
+    client.get.return_value = _live_service(traffic_distribution="PreferClose")
+    client.patch.return_value = _live_service()
+    ssa_harness.begin()
+
+    ssa_harness.charm.on.install.emit()
+
+    client.apply.assert_not_called()
+    client.patch.assert_called_once()
+    body = client.patch.call_args.args[2]
+    assert "trafficDistribution" in body["spec"]
+    assert body["spec"]["trafficDistribution"] is None
+
+    # Once cleared, the service is up to date and is not written again
+    client.patch.reset_mock()
+    client.get.return_value = _live_service()
+    ssa_harness.charm.on.install.emit()
+
+    assert client.get.call_count == 2
+    client.apply.assert_not_called()
+    client.patch.assert_not_called()
+
+
+def test_is_patch_recorded_only_after_a_successful_patch(ssa_harness, client):
+    client.get.return_value = _live_service(labels={"team": "other"})
+    client.apply.side_effect = ApiError(
+        response=httpx.Response(
+            500, json={"code": 500}, request=httpx.Request("PATCH", "https://fake")
+        )
+    )
+    ssa_harness.begin()
+
+    ssa_harness.charm.on.install.emit()
+    assert not ssa_harness.charm.service_patcher.is_patch_recorded()
+
+    client.apply.side_effect = None
+    client.apply.return_value = _live_service()
+    ssa_harness.charm.on.install.emit()
+    assert ssa_harness.charm.service_patcher.is_patch_recorded()
@@ -0,0 +1,387 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+import gzip
+import hashlib
+import json
+import os
+import threading
+import tracemalloc
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from operator import itemgetter
+from unittest.mock import MagicMock, patch
+
+import pytest
+import yaml
+from charms.loki_k8s.v1 import loki_push_api
+from charms.loki_k8s.v1.loki_push_api import (
+    AlertRules,
+    CosTool,
+    LogForwarder,
+    LogProxyConsumer,
+    _inject_simple_label_matchers,
+    _load_alert_rules_bundle,
+    build_alert_rules_bundle,
+)
+from ops.charm import CharmBase
+from ops.model import Container
+from ops.testing import Harness
+
+METADATA = """
+name: log-forwarder-tester
+containers:
+  workload:
+    resource: workload-image
+requires:
+  logging:
+    interface: loki_push_api
+"""
+
+LIB = "charms.loki_k8s.v1.loki_push_api"
+
+
+class LogForwarderTesterCharm(CharmBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.log_forwarder = LogForwarder(self)
+
+
+@pytest.fixture
+def harness():
+    with patch.dict("os.environ", {"JUJU_VERSION": "3.5.0"}):
+        harness = Harness(LogForwarderTesterCharm, meta=METADATA)
+        harness.set_model_name("kubeflow")
+        harness.set_can_connect("workload", True)
+        harness.begin()
+        yield harness
+        harness.cleanup()
+
+
+def _loki_endpoint(unit_name):
+    url = f"http://{unit_name.replace('/', '-')}:3100/loki/api/v1/push"
+    return {"endpoint": json.dumps({"url": url})}
+
+
+def _relate_loki(harness, unit_count):
+    rel_id = harness.add_relation("logging", "loki")
+    for i in range(unit_count):
+        harness.add_relation_unit(rel_id, f"loki/{i}")
+        harness.update_relation_data(rel_id, f"loki/{i}", _loki_endpoint(f"loki/{i}"))
+    return rel_id
+
+
+def _log_targets(harness):
+    return harness.get_container_pebble_plan("workload").to_dict()["log-targets"]
+
+
+def test_departed_endpoints_are_disabled_in_one_layer(harness):
+    # Log targets left over from 3 Loki units that departed at once
+    harness.charm.unit.get_container("workload").add_layer(
+        "workload-log-forwarding",
+        {
+            "log-targets": {
+                f"loki/{i}": {"override": "replace", "type": "loki", "services": ["all"]}
+                for i in range(1, 4)
+            }
+        },
+        combine=True,
+    )
+
+    with patch.object(
+        Container, "get_plan", autospec=True, side_effect=Container.get_plan
+    ) as get_plan:
+        with patch.object(
+            Container, "add_layer", autospec=True, side_effect=Container.add_layer
+        ) as add_layer:
+            _relate_loki(harness, 1)
+
+    # One relation-changed event for the single remaining Loki unit
+    assert get_plan.call_count == 1
+    assert add_layer.call_count == 1
+    targets = _log_targets(harness)
+    assert targets["loki/0"]["services"] == ["all"]
+    assert all(targets[f"loki/{i}"]["services"] == ["-all"] for i in range(1, 4))
+
+
+def test_unchanged_endpoints_skip_pebble(harness):
+    rel_id = _relate_loki(harness, 1)
+
+    with patch.object(
+        Container, "get_plan", autospec=True, side_effect=Container.get_plan
+    ) as get_plan:
+        harness.charm.on["logging"].relation_changed.emit(
+            harness.model.get_relation("logging", rel_id), app=harness.model.get_app("loki")
+        )
+
+    get_plan.assert_not_called()
+
+
+def test_pebble_ready_reads_plan_but_skips_noop_write(harness):
+    _relate_loki(harness, 1)
+
+    with patch.object(
+        Container, "get_plan", autospec=True, side_effect=Container.get_plan
+    ) as get_plan:
+        with patch.object(
+            Container, "add_layer", autospec=True, side_effect=Container.add_layer
+        ) as add_layer:
+            harness.container_pebble_ready("workload")
+
+    assert get_plan.call_count == 1
+    add_layer.assert_not_called()
+
+
+def test_alert_rules_are_processed_once_until_upgrade(harness):
+    harness.set_leader(True)
+
+    with patch.object(AlertRules, "add_path", autospec=True) as add_path:
+        rel_id = _relate_loki(harness, 2)
+        assert add_path.call_count == 1
+
+        harness.charm.on.upgrade_charm.emit()
+        harness.charm.on["logging"].relation_changed.emit(
+            harness.model.get_relation("logging", rel_id), app=harness.model.get_app("loki")
+        )
+        assert add_path.call_count == 2
+
+    databag = harness.get_relation_data(rel_id, harness.charm.app.name)
+    assert json.loads(databag["alert_rules"]) == {}
+    assert json.loads(databag["metadata"])["model"] == "kubeflow"
+
+
+TOPOLOGY = {"juju_model": "kubeflow", "juju_application": "oidc-gatekeeper"}
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    (
+        (
+            'count_over_time({job=~".+"} |= "error {x}" [5m]) > 0',
+            'count_over_time({job=~".+", juju_model="kubeflow", '
+            'juju_application="oidc-gatekeeper"} |= "error {x}" [5m]) > 0',
+        ),
+        (
+            'rate({juju_model="other"} | line_format "{{.msg}}" [1m])',
+            'rate({juju_model="other", juju_application="oidc-gatekeeper"}'
+            ' | line_format "{{.msg}}" [1m])',
+        ),
+        # Not simple, left to cos-tool
+        ("rate({job=.+}[1m])", None),
+        ('rate({job=~".+",}[1m])', None),
+        ("vector(1)", None),
+    ),
+)
+def test_inject_simple_label_matchers(expression, expected):
+    assert _inject_simple_label_matchers(expression, TOPOLOGY) == expected
+
+
+def test_batch_injection_runs_cos_tool_once_per_complex_expression():
+    tool = CosTool(None)
+    expressions = ['rate({job=~".+"}[1m])', "rate({job=.+}[1m])", "rate({job=.+}[1m])"]
+
+    with patch.object(CosTool, "path", "cos-tool"), patch.object(
+        CosTool, "_exec", side_effect=lambda args: "transformed"
+    ) as exec_:
+        injected = tool.inject_label_matchers_batch(expressions, TOPOLOGY)
+
+    exec_.assert_called_once()
+    assert injected[1:] == ["transformed", "transformed"]
+    assert injected[0].startswith('rate({job=~".+", juju_model="kubeflow"')
+
+
+def _write_alert_rules(path, count):
+    rules = [
+        {
+            "alert": f"Alert{i}",
+            "expr": f'count_over_time({{%%juju_topology%%}} |= "error {i}" [5m]) > 0',
+        }
+        for i in range(count)
+    ]
+    (path / "rules.rule").write_text(yaml.safe_dump({"groups": [{"name": "g", "rules": rules}]}))
+
+
+@pytest.mark.parametrize("count", (10, 100))
+def test_simple_alert_rules_do_not_run_cos_tool(tmp_path, harness, count):
+    _write_alert_rules(tmp_path, count)
+
+    with patch.object(CosTool, "path", "cos-tool"), patch.object(CosTool, "_exec") as exec_:
+        alert_rules = AlertRules(harness.charm.log_forwarder.topology)
+        alert_rules.add_path(str(tmp_path))
+
+    exec_.assert_not_called()
+    (group,) = alert_rules.as_dict()["groups"]
+    assert len(group["rules"]) == count
+    assert all('juju_model="kubeflow"' in rule["expr"] for rule in group["rules"])
+
+
+def test_alert_rules_bundle_matches_rule_files(tmp_path, harness):
+    _write_alert_rules(tmp_path, 3)
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "single.rule").write_text(
+        yaml.safe_dump({"alert": "Single", "expr": "rate({%%juju_topology%%}[1m]) > 1"})
+    )
+    topology = harness.charm.log_forwarder.topology
+
+    build_alert_rules_bundle(str(tmp_path), recursive=True)
+
+    from_files = AlertRules(topology)
+    from_files.add_path(str(tmp_path), recursive=True)
+    from_bundle = AlertRules(topology)
+    with patch("yaml.safe_load") as safe_load:
+        from_bundle.add_bundle(_load_alert_rules_bundle(str(tmp_path), recursive=True))
+    safe_load.assert_not_called()
+    key = itemgetter("name")
+    assert sorted(from_bundle.as_dict()["groups"], key=key) == sorted(
+        from_files.as_dict()["groups"], key=key
+    )
+    # A bundle built with other options is not used
+    assert _load_alert_rules_bundle(str(tmp_path), recursive=False) is None
+
+
+def test_log_forwarder_loads_alert_rules_bundle(tmp_path, harness):
+    harness.set_leader(True)
+    _write_alert_rules(tmp_path, 3)
+    build_alert_rules_bundle(str(tmp_path), recursive=True)
+    harness.charm.log_forwarder._alert_rules_path = str(tmp_path)
+
+    with patch("yaml.safe_load") as safe_load:
+        rel_id = _relate_loki(harness, 1)
+
+    safe_load.assert_not_called()
+    alert_rules = json.loads(
+        harness.get_relation_data(rel_id, "log-forwarder-tester")["alert_rules"]
+    )
+    assert len(alert_rules["groups"][0]["rules"]) == 3
+
+
+def test_unrelated_events_do_not_build_logging_state():
+    with patch.dict("os.environ", {"JUJU_VERSION": "3.5.0"}), patch(
+        f"{LIB}.JujuTopology.from_charm"
+    ) as from_charm, patch(f"{LIB}._resolve_dir_against_charm_path") as resolve, patch(
+        f"{LIB}._PebbleLogClient.check_juju_version"
+    ) as check_juju_version:
+        harness = Harness(LogForwarderTesterCharm, meta=METADATA)
+        harness.begin()
+        harness.charm.on.config_changed.emit()
+        harness.charm.on.update_status.emit()
+        harness.cleanup()
+
+    from_charm.assert_not_called()
+    resolve.assert_not_called()
+    check_juju_version.assert_not_called()
+
+
+def test_logging_state_is_built_once_when_needed(harness):
+    with patch(
+        f"{LIB}.JujuTopology.from_charm", side_effect=loki_push_api.JujuTopology.from_charm
+    ) as from_charm, patch(
+        f"{LIB}._resolve_dir_against_charm_path",
+        side_effect=loki_push_api._resolve_dir_against_charm_path,
+    ) as resolve, patch(
+        f"{LIB}._PebbleLogClient.check_juju_version", return_value=True
+    ) as check_juju_version:
+        harness.set_leader(True)
+        _relate_loki(harness, 3)
+
+    from_charm.assert_called_once()
+    resolve.assert_called_once()
+    check_juju_version.assert_called_once()
+    assert str(check_juju_version.call_args.args[0]) == "3.5.0"
+
+
+def test_unit_endpoints_are_parsed_once(harness):
+    rel_id = _relate_loki(harness, 10)
+    relation = harness.model.get_relation("logging", rel_id)
+    forwarder = harness.charm.log_forwarder
+    # Start from a new dispatch
+    forwarder._unit_endpoints_cache.clear()
+
+    with patch("json.loads", side_effect=json.loads) as loads:
+        assert forwarder.is_ready(relation)
+        assert len(forwarder._fetch_endpoints(relation)) == 10
+        assert len(forwarder.loki_endpoints) == 10
+
+    assert loads.call_count == 10
+
+
+def test_malformed_unit_endpoint_is_reported_once(harness, caplog):
+    rel_id = _relate_loki(harness, 2)
+    caplog.clear()
+    # Handled by the logging relation-changed observers
+    harness.update_relation_data(rel_id, "loki/1", {"endpoint": "{not json"})
+    relation = harness.model.get_relation("logging", rel_id)
+    forwarder = harness.charm.log_forwarder
+
+    assert not forwarder.is_ready(relation)
+    assert forwarder._fetch_endpoints(relation) == {}
+    assert forwarder.loki_endpoints == [json.loads(_loki_endpoint("loki/0")["endpoint"])]
+
+    assert len([r for r in caplog.records if "Malformed Loki endpoint" in r.message]) == 1
+
+
+class SelectiveLogForwarderTesterCharm(CharmBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.log_forwarder = LogForwarder(
+            self, services=["workload"], labels={"team": "auth", "juju_model": "other"}
+        )
+
+
+def test_log_targets_select_services_and_add_labels():
+    with patch.dict("os.environ", {"JUJU_VERSION": "3.5.0"}):
+        harness = Harness(SelectiveLogForwarderTesterCharm, meta=METADATA)
+        harness.set_model_name("kubeflow")
+        harness.set_can_connect("workload", True)
+        harness.begin()
+
+        _relate_loki(harness, 1)
+
+    target = _log_targets(harness)["loki/0"]
+    assert target["services"] == ["workload"]
+    assert target["labels"]["team"] == "auth"
+    # Custom labels do not override the topology
+    assert target["labels"]["juju_model"] == "kubeflow"
+    harness.cleanup()
+
+
+@pytest.fixture
+def promtail_server(tmp_path):
+    """Serve a gzipped stand-in for the promtail binary over local HTTP."""
+    binary = os.urandom(8 * 1024 * 1024)
+    (tmp_path / "promtail.gz").write_bytes(gzip.compress(binary, compresslevel=1))
+    handler = partial(SimpleHTTPRequestHandler, directory=str(tmp_path))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/promtail.gz", binary
+    server.shutdown()
+    server.server_close()
+
+
+def test_promtail_download_is_streamed(promtail_server, tmp_path):
+    url, binary = promtail_server
+    binary_dir = tmp_path / "charm"
+    binary_dir.mkdir()
+    consumer = MagicMock()
+    promtail_info = {"url": url, "filename": "promtail-static-amd64"}
+
+    tracemalloc.start()
+    with patch(f"{LIB}.BINARY_DIR", str(binary_dir)), patch.dict(
+        "os.environ", {"JUJU_CHARM_NO_PROXY": "127.0.0.1"}
+    ):
+        LogProxyConsumer._download_and_push_promtail_to_workload(
+            consumer, MagicMock(), promtail_info
+        )
+        matches = LogProxyConsumer._sha256sums_matches(
+            consumer,
+            str(binary_dir / "promtail-static-amd64"),
+            hashlib.sha256(binary).hexdigest(),
+        )
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert matches
+    assert (binary_dir / "promtail-static-amd64").read_bytes() == binary
+    consumer._push_binary_to_workload.assert_called_once()
+    # The 8 MiB binary never sits in memory as a whole
+    assert peak < 1024 * 1024
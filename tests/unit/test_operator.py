@@ -1,5 +1,6 @@
 # Copyright 2023 Canonical Ltd.
 # See LICENSE file for licensing details.
+import json
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -10,6 +11,7 @@ from charms.dex_auth.v0.dex_oidc_config import (
     DexOidcConfigRelationMissingError,
     DexOidcConfigRequirer,
 )
+from charms.istio_ingress_k8s.v0.istio_ingress_route import serialize_config
 from ops.model import ActiveStatus, BlockedStatus, WaitingStatus
 from ops.testing import Harness
 
@@ -25,7 +27,7 @@ def harness():
     harness.cleanup()
 
 
-@patch("charm.KubernetesServicePatch", lambda x, y: None)
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
 def test_log_forwarding(harness):
     """Test LogForwarder initialization."""
     with patch("charm.LogForwarder") as mock_logging:
@@ -33,14 +35,14 @@ def test_log_forwarding(harness):
         mock_logging.assert_called_once_with(charm=harness.charm)
 
 
-@patch("charm.KubernetesServicePatch", lambda x, y: None)
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
 def test_not_leader(harness: Harness):
     harness.set_leader(False)
     harness.begin_with_initial_hooks()
     assert harness.charm.model.unit.status == WaitingStatus("Waiting for leadership")
 
 
-@patch("charm.KubernetesServicePatch", lambda x, y: None)
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
 def test_no_relation(harness):
     # Add dex-oidc-config relation by default; otherwise charm will block
     harness.add_relation("dex-oidc-config", "app", app_data={"issuer-url": "http://dex.io/dex"})
@@ -58,7 +60,7 @@ def test_no_relation(harness):
     assert harness.charm.model.unit.status == ActiveStatus()
 
 
-@patch("charm.KubernetesServicePatch", lambda x, y: None)
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
 def test_with_relation(harness):
     # Add dex-oidc-config relation by default; otherwise charm will block
     harness.add_relation("dex-oidc-config", "app", app_data={"issuer-url": "http://dex.io/dex"})
@@ -77,7 +79,7 @@ def test_with_relation(harness):
     assert isinstance(harness.charm.model.unit.status, ActiveStatus)
 
 
-@patch("charm.KubernetesServicePatch", lambda x, y: None)
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
 def test_skip_auth_url_config_has_value(harness):
     harness.update_config({"skip-auth-urls": "/test/,/path1/"})
 
@@ -93,7 +95,7 @@ def test_skip_auth_url_config_has_value(harness):
     )
 
 
-@patch("charm.KubernetesServicePatch", lambda x, y: None)
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
 def test_skip_auth_url_config_is_empty(harness):
     # Add dex-oidc-config relation by default; otherwise charm will block
     harness.add_relation("dex-oidc-config", "app", app_data={"issuer-url": "http://dex.io/dex"})
@@ -105,7 +107,7 @@ def test_skip_auth_url_config_is_empty(harness):
     assert plan.services["oidc-authservice"].environment["SKIP_AUTH_URLS"] == "/dex/"
 
 
-@patch("charm.KubernetesServicePatch", lambda x, y: None)
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
 def test_ca_bundle_config(harness):
     harness.update_config({"ca-bundle": "aaa"})
     # Add dex-oidc-config relation by default; otherwise charm will block
@@ -120,7 +122,7 @@ def test_ca_bundle_config(harness):
     )
 
 
-@patch("charm.KubernetesServicePatch", lambda x, y: None)
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
 def test_session_store(harness):
     # Add dex-oidc-config relation by default; otherwise charm will block
     harness.add_relation("dex-oidc-config", "app", app_data={"issuer-url": "http://dex.io/dex"})
@@ -138,7 +140,7 @@ def test_session_store(harness):
 
 
 @patch("charm.update_layer", MagicMock())
-@patch("charm.KubernetesServicePatch", lambda x, y: None)
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
 def test_pebble_ready_hook_handled(harness: Harness):
     """
     Test if we handle oidc_authservice_pebble_ready hook. This test fails if we don't.
@@ -157,7 +159,7 @@ def test_pebble_ready_hook_handled(harness: Harness):
     assert isinstance(harness.charm.model.unit.status, ActiveStatus)
 
 
-@patch("charm.KubernetesServicePatch", lambda x, y: None)
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
 def test_charm_blocks_on_missing_dex_oidc_config_relation(harness):
     """Test the charm goes into BlockedStatus when the relation is missing."""
     harness.add_oci_resource(
@@ -177,7 +179,7 @@ def test_charm_blocks_on_missing_dex_oidc_config_relation(harness):
     )
 
 
-@patch("charm.KubernetesServicePatch", lambda x, y: None)
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
 def test_service_environment_uses_data_from_relation(harness):
     """Test the service_environment property has the correct values set by the relation data."""
     # Add the client-secret peer relation as it is required to render the service environment
@@ -192,7 +194,7 @@ def test_service_environment_uses_data_from_relation(harness):
     assert service_environment["OIDC_PROVIDER"] == expected_oidc_provider
 
 
-@patch("charm.KubernetesServicePatch", lambda x, y: None)
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
 @pytest.mark.parametrize(
     "expected_raise, expected_status",
     (
@@ -210,3 +212,211 @@ def test_check_dex_oidc_config_relation(mocked_get_data, expected_raise, expecte
 
     # We can only check what status is sent to the main handler, which is the one setting it
     assert raised_exception.value.status_type == expected_status
+
+
+@patch("charm.update_layer")
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
+def test_charm_blocks_on_invalid_service_mesh_data(mocked_update_layer, harness):
+    """Test the charm is configured, then blocked, on invalid service-mesh provider data."""
+    harness.add_relation("dex-oidc-config", "app", app_data={"issuer-url": "http://dex.io/dex"})
+    harness.add_relation(
+        "service-mesh", "istio-beacon", app_data={"labels": "{}", "mesh_type": '"unknown"'}
+    )
+    harness.begin()
+    harness.charm._get_interfaces = MagicMock()
+    harness.charm._check_secret = MagicMock()
+    harness.charm._send_info = MagicMock()
+    harness.charm._configure_mesh = MagicMock()
+    harness.charm._configure_zone_spread = MagicMock()
+
+    harness.charm.on.config_changed.emit()
+
+    harness.charm._configure_mesh.assert_called_once()
+    mocked_update_layer.assert_called_once()
+    assert harness.charm.model.unit.status == BlockedStatus(
+        "Invalid data in service-mesh relation, see debug-log for details."
+    )
+
+
+@patch("charm.KubernetesServicePatch")
+def test_libraries_share_one_kubernetes_client(mocked_service_patch, harness):
+    """Test the charm hands the same Kubernetes client to every library."""
+    harness.begin()
+
+    shared_client = harness.charm._lightkube_client
+    assert mocked_service_patch.call_args.kwargs["lightkube_client"] is shared_client
+    assert harness.charm._mesh.lightkube_client is shared_client
+
+
+@pytest.mark.parametrize(
+    "config, expected_annotations, expected_traffic_distribution",
+    (
+        ({}, {}, None),
+        (
+            {"topology-aware-routing": True, "traffic-distribution": "PreferClose"},
+            {"service.kubernetes.io/topology-mode": "Auto"},
+            "PreferClose",
+        ),
+        # An invalid value must not reach, and fail, the Service patch
+        ({"traffic-distribution": "PreferFar"}, {}, None),
+    ),
+)
+@patch("charm.KubernetesServicePatch")
+def test_topology_aware_routing_config(
+    mocked_service_patch, config, expected_annotations, expected_traffic_distribution, harness
+):
+    """Test the topology-aware routing options are passed to the Service patch."""
+    harness.update_config(config)
+    harness.begin()
+
+    kwargs = mocked_service_patch.call_args.kwargs
+    assert kwargs["additional_annotations"] == expected_annotations
+    assert kwargs["traffic_distribution"] == expected_traffic_distribution
+
+
+@pytest.mark.parametrize(
+    "patch_recorded, expected_annotations",
+    (
+        (True, {"service.kubernetes.io/topology-mode": "Disabled"}),
+        # The Auto annotation never reached the Service, so there is nothing to disable
+        (False, {}),
+    ),
+)
+@patch("charm.KubernetesServicePatch")
+def test_topology_aware_routing_is_disabled_explicitly(
+    mocked_service_patch, patch_recorded, expected_annotations, harness
+):
+    """Test turning topology-aware routing off, once it was applied, disables it on the Service."""
+    mocked_service_patch.return_value.is_patch_recorded.return_value = patch_recorded
+    harness.begin()
+    assert not harness.charm._stored.topology_mode_applied
+
+    harness.update_config({"topology-aware-routing": True})
+    harness.update_config({"topology-aware-routing": False})
+
+    assert harness.charm._service_annotations == expected_annotations
+
+
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
+def test_invalid_traffic_distribution_blocks(harness):
+    """Test an unsupported traffic-distribution blocks the charm."""
+    harness.update_config({"traffic-distribution": "PreferFar"})
+    harness.add_relation("dex-oidc-config", "app", app_data={"issuer-url": "http://dex.io/dex"})
+
+    harness.begin_with_initial_hooks()
+
+    assert harness.charm.model.unit.status == BlockedStatus(
+        "Invalid traffic-distribution, expected one of PreferClose, PreferSameZone, "
+        "PreferSameNode."
+    )
+
+
+@pytest.mark.parametrize("planned_units, expect_patch", ((1, False), (3, True)))
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
+def test_zone_spread(planned_units, expect_patch, harness):
+    """Test the zone spread constraint is only added when scaled out."""
+    harness.update_config({"zone-spread": True})
+    harness.set_planned_units(planned_units)
+    harness.begin()
+    client = MagicMock()
+    client.get.return_value.spec.template.spec.topologySpreadConstraints = None
+    harness.charm._lightkube_client = client
+
+    harness.charm._configure_zone_spread()
+
+    assert client.patch.called == expect_patch
+    if expect_patch:
+        constraints = client.patch.call_args.kwargs["obj"]["spec"]["template"]["spec"][
+            "topologySpreadConstraints"
+        ]
+        assert constraints[0]["topologyKey"] == "topology.kubernetes.io/zone"
+    assert harness.charm._stored.zone_spread_applied == expect_patch
+
+
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
+def test_ingress_route_config_is_cached(harness):
+    """Test the ingress route config is built once and only rebuilt on upgrade-charm."""
+    rel_id = harness.add_relation("istio-ingress-route-unauthenticated", "istio-ingress")
+    harness.begin()
+
+    expected = serialize_config(harness.charm._ingress_route_config())
+    assert harness.get_relation_data(rel_id, harness.charm.app.name)["config"] == expected
+
+    with patch.object(
+        harness.charm, "_ingress_route_config", wraps=harness.charm._ingress_route_config
+    ) as mocked_config:
+        harness.charm._ambient_mesh_ingress()
+        mocked_config.assert_not_called()
+
+        harness.charm.on.upgrade_charm.emit()
+        mocked_config.assert_called_once()
+
+
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
+def test_one_reconcile_per_dex_change(harness):
+    """Test a Dex OIDC config change runs main once, and unchanged data does not run it."""
+    rel_id = harness.add_relation("dex-oidc-config", "dex-auth")
+    harness.add_relation_unit(rel_id, "dex-auth/0")
+    harness.begin()
+
+    with patch.object(harness.charm, "_check_leader") as reconcile:
+        harness.update_relation_data(rel_id, "dex-auth", {"issuer-url": "http://dex.io/dex"})
+        assert reconcile.call_count == 1
+
+        harness.update_relation_data(rel_id, "dex-auth/0", {"ingress-address": "10.0.0.1"})
+        assert reconcile.call_count == 1
+
+
+@pytest.mark.parametrize("log_level, expected", (("info", "INFO"), ("Warn", "WARN")))
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
+def test_log_level_config(log_level, expected, harness):
+    """Test the log-level config is rendered into the workload environment."""
+    harness.update_config({"log-level": log_level})
+    harness.add_relation("dex-oidc-config", "app", app_data={"issuer-url": "http://dex.io/dex"})
+
+    harness.begin_with_initial_hooks()
+
+    plan = harness.get_container_pebble_plan("oidc-authservice")
+    assert plan.services["oidc-authservice"].environment["LOG_LEVEL"] == expected
+
+
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
+def test_invalid_log_level_blocks(harness):
+    """Test an unsupported log-level blocks the charm."""
+    harness.update_config({"log-level": "verbose"})
+    harness.add_relation("dex-oidc-config", "app", app_data={"issuer-url": "http://dex.io/dex"})
+
+    harness.begin_with_initial_hooks()
+
+    assert harness.charm.model.unit.status == BlockedStatus(
+        "Invalid log-level, expected one of debug, info, warn, error."
+    )
+
+
+@patch("charm.KubernetesServicePatch", lambda *args, **kwargs: None)
+def test_forward_auth_protects_only_allow_listed_ingress_apps(harness):
+    """Test only the allow-listed apps routed through ingress by the requirer are protected."""
+    harness.begin()
+    rel_id = harness.add_relation("forward-auth", "traefik")
+
+    harness.update_relation_data(
+        rel_id,
+        "traefik",
+        {"ingress_app_names": json.dumps(["dex-auth", "jupyter-ui", "kfp-ui"])},
+    )
+    databag = harness.get_relation_data(rel_id, harness.charm.app.name)
+    assert json.loads(databag["app_names"]) == []
+
+    harness.update_config({"forward-auth-apps": "jupyter-ui, kfp-ui"})
+    databag = harness.get_relation_data(rel_id, harness.charm.app.name)
+    assert json.loads(databag["app_names"]) == ["jupyter-ui", "kfp-ui"]
+
+    harness.update_relation_data(
+        rel_id, "traefik", {"ingress_app_names": json.dumps(["dex-auth", "kfp-ui"])}
+    )
+    databag = harness.get_relation_data(rel_id, harness.charm.app.name)
+    assert json.loads(databag["app_names"]) == ["kfp-ui"]
+
+    harness.update_config({"forward-auth-apps": ""})
+    databag = harness.get_relation_data(rel_id, harness.charm.app.name)
+    assert json.loads(databag["app_names"]) == []
@@ -0,0 +1,526 @@
+# Copyright 2025 Canonical Ltd.
+# See LICENSE file for licensing details.
+import hashlib
+import json
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import pytest
+from charms.istio_beacon_k8s.v0.service_mesh import (
+    AppPolicy,
+    CMRData,
+    Endpoint,
+    MeshPolicy,
+    MeshType,
+    Method,
+    PolicyResourceApplyError,
+    PolicyResourceConnectionError,
+    PolicyResourceManager,
+    PolicyTargetType,
+    ServiceMeshConsumer,
+    ServiceMeshProviderAppData,
+    UnitPolicy,
+    _generate_network_policy_name,
+    _hash_pydantic_model,
+    _legacy_hash_pydantic_model,
+    build_mesh_policies,
+)
+from lightkube import ApiError
+from lightkube.models.meta_v1 import ObjectMeta
+from lightkube.resources.core_v1 import ConfigMap
+from ops.charm import CharmBase
+from ops.testing import Harness
+
+METADATA = """
+name: mesh-tester
+requires:
+  service-mesh:
+    interface: service_mesh
+    limit: 1
+  require-cmr-mesh:
+    interface: cross_model_mesh
+provides:
+  provide-cmr-mesh:
+    interface: cross_model_mesh
+  data:
+    interface: data
+  metrics:
+    interface: metrics
+"""
+
+POLICIES = [
+    AppPolicy(
+        relation="data",
+        endpoints=[Endpoint(ports=[8080], methods=[Method.get], paths=["/data"])],
+    ),
+    AppPolicy(relation="data", endpoints=[Endpoint(ports=[9090])], service="data-svc"),
+    UnitPolicy(relation="metrics", ports=[9100]),
+]
+
+
+class MeshTesterCharm(CharmBase):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.mesh = ServiceMeshConsumer(self, policies=POLICIES, auto_join=False)
+
+
+@pytest.fixture
+def harness():
+    harness = Harness(MeshTesterCharm, meta=METADATA)
+    harness.set_model_name("kubeflow")
+    harness.set_leader(True)
+    yield harness
+    harness.cleanup()
+
+
+def _add_cmr_consumers(harness, count):
+    for i in range(count):
+        remote_app = f"remote-{i}"
+        harness.add_relation("data", remote_app)
+        harness.add_relation(
+            "provide-cmr-mesh",
+            remote_app,
+            app_data={
+                "cmr_data": json.dumps({"app_name": f"app-{i}", "juju_model_name": f"model-{i}"})
+            },
+        )
+
+
+def _policies_in_databag(harness, mesh_relation_id):
+    return json.loads(harness.get_relation_data(mesh_relation_id, "mesh-tester")["policies"])
+
+
+def test_update_service_mesh_uses_cmr_data(harness):
+    mesh_relation_id = harness.add_relation("service-mesh", "beacon")
+    _add_cmr_consumers(harness, 2)
+    harness.add_relation("metrics", "local-app")
+    harness.begin()
+
+    harness.charm.mesh.update_service_mesh()
+
+    sources = {
+        (p["source_app_name"], p["source_namespace"])
+        for p in _policies_in_databag(harness, mesh_relation_id)
+    }
+    assert sources == {("app-0", "model-0"), ("app-1", "model-1"), ("local-app", "kubeflow")}
+
+
+def test_cmr_data_cache_skips_validation_of_known_data(harness):
+    harness.add_relation("service-mesh", "beacon")
+    _add_cmr_consumers(harness, 3)
+    harness.begin()
+
+    with patch.object(CMRData, "model_validate", wraps=CMRData.model_validate) as validate:
+        harness.charm.mesh.update_service_mesh()
+        assert validate.call_count == 3
+
+        # Later calls reuse the StoredState cache and validate nothing
+        harness.charm.mesh.update_service_mesh()
+        assert validate.call_count == 3
+
+    assert len(harness.charm.mesh._stored.cmr_data_cache) == 3
+
+
+def test_cmr_data_cache_drops_stale_entries(harness):
+    harness.add_relation("service-mesh", "beacon")
+    _add_cmr_consumers(harness, 2)
+    cmr_relation_id = harness.model.relations["provide-cmr-mesh"][0].id
+    harness.begin()
+    harness.charm.mesh.update_service_mesh()
+
+    harness.update_relation_data(
+        cmr_relation_id,
+        "remote-0",
+        {"cmr_data": json.dumps({"app_name": "renamed", "juju_model_name": "model-0"})},
+    )
+
+    cached_app_names = {v["app_name"] for v in harness.charm.mesh._stored.cmr_data_cache.values()}
+    assert cached_app_names == {"renamed", "app-1"}
+
+
+def _fake_relation_mapping(relation_count):
+    return {
+        relation_name: [
+            SimpleNamespace(name=relation_name, app=SimpleNamespace(name=f"{relation_name}-{i}"))
+            for i in range(relation_count)
+        ]
+        for relation_name in ("data", "metrics")
+    }
+
+
+def _build_mesh_policies_reference(
+    relation_mapping, target_app_name, target_namespace, policies, cmr_application_data
+):
+    """Build mesh policies with a full MeshPolicy per (policy, relation), as done historically."""
+    mesh_policies = []
+    for policy in policies:
+        for relation in relation_mapping[policy.relation]:
+            if relation.app.name in cmr_application_data:
+                source_app_name = cmr_application_data[relation.app.name].app_name
+                source_namespace = cmr_application_data[relation.app.name].juju_model_name
+            else:
+                source_app_name = relation.app.name
+                source_namespace = target_namespace
+            if isinstance(policy, UnitPolicy):
+                mesh_policy = MeshPolicy(
+                    source_namespace=source_namespace,
+                    source_app_name=source_app_name,
+                    target_namespace=target_namespace,
+                    target_app_name=target_app_name,
+                    target_service=None,
+                    target_type=PolicyTargetType.unit,
+                    endpoints=[Endpoint(ports=policy.ports)] if policy.ports else [],
+                )
+            else:
+                mesh_policy = MeshPolicy(
+                    source_namespace=source_namespace,
+                    source_app_name=source_app_name,
+                    target_namespace=target_namespace,
+                    target_app_name=target_app_name,
+                    target_service=policy.service,
+                    target_type=PolicyTargetType.app,
+                    endpoints=policy.endpoints,
+                )
+            mesh_policies.append(mesh_policy.model_dump())
+    return mesh_policies
+
+
+def test_build_mesh_policies_matches_reference():
+    """Golden test: the template-based builder matches a per-relation MeshPolicy build."""
+    relation_mapping = _fake_relation_mapping(5)
+    policies = POLICIES + [UnitPolicy(relation="metrics")]
+    cmr_application_data = {
+        "data-1": CMRData(app_name="remote-app", juju_model_name="remote-model"),
+        "metrics-3": CMRData(app_name="remote-metrics", juju_model_name="other-model"),
+    }
+    kwargs = dict(
+        relation_mapping=relation_mapping,
+        target_app_name="mesh-tester",
+        target_namespace="kubeflow",
+        policies=policies,
+        cmr_application_data=cmr_application_data,
+    )
+
+    result = build_mesh_policies(**kwargs)
+    expected = _build_mesh_policies_reference(**kwargs)
+
+    assert result == expected
+    assert json.dumps(result) == json.dumps(expected)
+
+
+def test_build_mesh_policies_returns_independent_copies():
+    result = build_mesh_policies(
+        relation_mapping=_fake_relation_mapping(2),
+        target_app_name="mesh-tester",
+        target_namespace="kubeflow",
+        policies=POLICIES[:1],
+        cmr_application_data={},
+    )
+
+    result[0]["endpoints"][0]["ports"].append(1234)
+    result[0]["endpoints"].append({"ports": [4321]})
+
+    assert result[1]["endpoints"] == [
+        {"hosts": None, "ports": [8080], "methods": [Method.get], "paths": ["/data"]}
+    ]
+
+
+def test_build_mesh_policies_validates_once_per_policy():
+    with patch.object(
+        MeshPolicy, "__init__", autospec=True, side_effect=MeshPolicy.__init__
+    ) as init:
+        result = build_mesh_policies(
+            relation_mapping=_fake_relation_mapping(1000),
+            target_app_name="mesh-tester",
+            target_namespace="kubeflow",
+            policies=POLICIES,
+            cmr_application_data={},
+        )
+
+    assert init.call_count == len(POLICIES)
+    assert len(result) == 1000 * len(POLICIES)
+
+
+def test_provider_app_data_is_parsed_once(harness):
+    harness.add_relation(
+        "service-mesh",
+        "beacon",
+        app_data={
+            "labels": json.dumps({"istio.io/dataplane-mode": "ambient"}),
+            "mesh_type": json.dumps("istio"),
+        },
+    )
+    harness.begin()
+
+    with patch.object(
+        ServiceMeshProviderAppData,
+        "model_validate",
+        wraps=ServiceMeshProviderAppData.model_validate,
+    ) as validate:
+        app_data = harness.charm.mesh.provider_app_data()
+        assert harness.charm.mesh.labels() == {"istio.io/dataplane-mode": "ambient"}
+        assert harness.charm.mesh.mesh_type() == MeshType.istio
+        assert validate.call_count == 1
+
+    assert app_data.labels == {"istio.io/dataplane-mode": "ambient"}
+    assert app_data.mesh_type == MeshType.istio
+    assert harness.charm.mesh.provider_app_data_error() is None
+
+
+def test_provider_app_data_reparsed_when_databag_changes(harness):
+    relation_id = harness.add_relation(
+        "service-mesh",
+        "beacon",
+        app_data={"labels": json.dumps({"a": "b"}), "mesh_type": json.dumps("istio")},
+    )
+    harness.begin()
+    assert harness.charm.mesh.labels() == {"a": "b"}
+
+    harness.update_relation_data(relation_id, "beacon", {"labels": json.dumps({"c": "d"})})
+
+    assert harness.charm.mesh.labels() == {"c": "d"}
+
+
+def test_invalid_provider_app_data_is_reported_not_raised(harness):
+    harness.add_relation(
+        "service-mesh",
+        "beacon",
+        app_data={"labels": json.dumps({"a": "b"}), "mesh_type": json.dumps("unknown")},
+    )
+    harness.begin()
+
+    assert harness.charm.mesh.labels() == {}
+    assert harness.charm.mesh.mesh_type() is None
+    assert harness.charm.mesh.provider_app_data() is None
+    assert "Invalid data in the service-mesh relation" in (
+        harness.charm.mesh.provider_app_data_error()
+    )
+
+
+class FakeKubernetesApi:
+    """A lightkube Client stand-in that answers every call after a fixed latency."""
+
+    def __init__(self, latency=0.0, failures=None, existing=None, barrier=None):
+        self.latency = latency
+        # Every patch waits here until `barrier.parties` patches are in flight together
+        self.barrier = barrier
+        # {resource name: [status codes, or exceptions, to fail with, in order]}
+        self.failures = failures or {}
+        self.existing = existing or []
+        self.listed = 0
+        self.patched = []
+        self.deleted = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def list(self, *_args, **_kwargs):
+        self.listed += 1
+        return list(self.existing)
+
+    def delete(self, res, name, namespace=None, **_kwargs):
+        self.deleted.append(name)
+
+    def patch(self, res, name, obj, namespace=None, **_kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.barrier is not None:
+                self.barrier.wait()
+            time.sleep(self.latency)
+            failures = self.failures.get(name)
+            if failures:
+                failure = failures.pop(0)
+                if isinstance(failure, Exception):
+                    raise failure
+                raise ApiError(
+                    response=httpx.Response(
+                        failure,
+                        json={"code": failure, "message": f"failed {name}"},
+                        request=httpx.Request("PATCH", "https://fake"),
+                    )
+                )
+            self.patched.append(name)
+            return obj
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _policy_resource_manager(client, max_workers):
+    charm = SimpleNamespace(
+        app=SimpleNamespace(name="mesh-tester"), model=SimpleNamespace(name="kubeflow")
+    )
+    return PolicyResourceManager(
+        charm=charm,
+        lightkube_client=client,
+        labels={"app.kubernetes.io/name": "mesh-tester-kubeflow"},
+        max_workers=max_workers,
+        retry_backoff=0,
+    )
+
+
+def _mesh_policies(count):
+    return [
+        MeshPolicy(
+            source_namespace="kubeflow",
+            source_app_name=f"app-{i}",
+            target_namespace="kubeflow",
+            target_app_name="mesh-tester",
+            endpoints=[Endpoint(ports=[8080])],
+        )
+        for i in range(count)
+    ]
+
+
+def _build_resources(policies):
+    prm = _policy_resource_manager(FakeKubernetesApi(), max_workers=1)
+    return prm._build_policy_resources(policies, MeshType.istio)
+
+
+@pytest.mark.parametrize("max_workers", (1, 4, 8, 32))
+def test_policy_resource_manager_concurrent_reconcile(max_workers):
+    """Applies overlap up to the concurrency limit, and never beyond it."""
+    resource_count = 16
+    parallelism = min(max_workers, resource_count)
+    # Fewer than `parallelism` concurrent patches would break the barrier and fail the applies
+    barrier = threading.Barrier(parallelism, timeout=5) if parallelism > 1 else None
+    client = FakeKubernetesApi(barrier=barrier)
+    prm = _policy_resource_manager(client, max_workers)
+
+    prm.reconcile(_mesh_policies(resource_count), MeshType.istio)
+
+    assert len(client.patched) == resource_count
+    assert client.peak_in_flight == parallelism
+
+
+@pytest.mark.parametrize("max_workers", (1, 4))
+def test_policy_resource_manager_lists_deployed_resources_once(max_workers):
+    client = FakeKubernetesApi(existing=_build_resources(_mesh_policies(3)[2:]))
+    prm = _policy_resource_manager(client, max_workers)
+
+    prm.reconcile(_mesh_policies(2), MeshType.istio)
+
+    # One listing per supported policy resource type
+    assert client.listed == len(prm._get_all_supported_policy_resource_types())
+    assert len(client.deleted) == 1
+    assert len(client.patched) == 2
+
+
+@pytest.mark.parametrize("max_workers", (1, 4))
+def test_policy_resource_manager_rejects_unsupported_resources(max_workers):
+    client = FakeKubernetesApi()
+    prm = _policy_resource_manager(client, max_workers)
+    prm._validate_raw_policies = lambda _: None
+
+    with pytest.raises(ValueError):
+        prm.reconcile([], MeshType.istio, raw_policies=[ConfigMap(metadata=ObjectMeta(name="x"))])
+
+    assert client.patched == client.deleted == []
+
+
+def test_policy_resource_manager_translates_transport_errors():
+    policies = _mesh_policies(2)
+    name = _build_resources(policies)[0].metadata.name
+    client = FakeKubernetesApi(failures={name: [httpx.ConnectError("unreachable")]})
+    prm = _policy_resource_manager(client, max_workers=2)
+
+    with pytest.raises(PolicyResourceApplyError) as raised:
+        prm.reconcile(policies, MeshType.istio)
+
+    ((failed, error),) = raised.value.errors
+    assert failed == name
+    assert isinstance(error, PolicyResourceConnectionError)
+    assert isinstance(error.__cause__, httpx.ConnectError)
+
+
+def test_policy_resource_manager_translates_transport_errors_without_workers():
+    policies = _mesh_policies(2)
+    name = _build_resources(policies)[0].metadata.name
+    client = FakeKubernetesApi(failures={name: [httpx.ConnectError("unreachable")]})
+    prm = _policy_resource_manager(client, max_workers=1)
+
+    with pytest.raises(PolicyResourceConnectionError) as raised:
+        prm.reconcile(policies, MeshType.istio)
+
+    assert isinstance(raised.value.__cause__, httpx.ConnectError)
+
+
+def test_policy_resource_manager_retries_throttled_applies():
+    policies = _mesh_policies(3)
+    prm = _policy_resource_manager(FakeKubernetesApi(), max_workers=2)
+    names = [r.metadata.name for r in prm._build_policy_resources(policies, MeshType.istio)]
+    client = FakeKubernetesApi(failures={names[0]: [429, 503]})
+    prm = _policy_resource_manager(client, max_workers=2)
+
+    prm.reconcile(policies, MeshType.istio)
+
+    assert sorted(client.patched) == sorted(names)
+
+
+def test_policy_resource_manager_aggregates_errors_in_order():
+    policies = _mesh_policies(4)
+    prm = _policy_resource_manager(FakeKubernetesApi(), max_workers=4)
+    names = [r.metadata.name for r in prm._build_policy_resources(policies, MeshType.istio)]
+    client = FakeKubernetesApi(failures={names[3]: [403], names[1]: [500, 500, 500]})
+    prm = _policy_resource_manager(client, max_workers=4)
+
+    with pytest.raises(PolicyResourceApplyError) as raised:
+        prm.reconcile(policies, MeshType.istio)
+
+    assert [name for name, _ in raised.value.errors] == [names[1], names[3]]
+    assert sorted(client.patched) == sorted([names[0], names[2]])
+
+
+def test_policy_hash_uses_canonical_json():
+    policy = _mesh_policies(1)[0]
+    canonical = json.dumps(policy.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+
+    assert _hash_pydantic_model(policy) == hashlib.sha256(canonical.encode()).hexdigest()
+    # Field order in the constructor must not matter
+    reordered = MeshPolicy(
+        endpoints=[Endpoint(ports=[8080])],
+        target_app_name="mesh-tester",
+        target_namespace="kubeflow",
+        source_app_name="app-0",
+        source_namespace="kubeflow",
+    )
+    assert _hash_pydantic_model(reordered) == _hash_pydantic_model(policy)
+
+
+@pytest.mark.parametrize("max_workers", (1, 4))
+def test_policy_resource_manager_adopts_legacy_names(max_workers):
+    policies = _mesh_policies(2)
+    legacy_name = _generate_network_policy_name(
+        "mesh-tester", "kubeflow", policies[0], hasher=_legacy_hash_pydantic_model
+    )
+    new_names = [
+        _generate_network_policy_name("mesh-tester", "kubeflow", policy) for policy in policies
+    ]
+    assert legacy_name != new_names[0]
+    prm = _policy_resource_manager(FakeKubernetesApi(), max_workers)
+    deployed = prm._build_policy_resources(policies[:1], MeshType.istio)
+    deployed[0].metadata.name = legacy_name
+    client = FakeKubernetesApi(existing=deployed)
+    prm = _policy_resource_manager(client, max_workers)
+
+    prm.reconcile(policies, MeshType.istio)
+
+    assert sorted(client.patched) == sorted([legacy_name, new_names[1]])
+    assert client.deleted == []
+
+
+def test_policy_names_are_unique_and_stable():
+    policies = _mesh_policies(5000)
+
+    names = [_generate_network_policy_name("mesh-tester", "kubeflow", p) for p in policies]
+
+    assert len(set(names)) == len(policies)
+    assert names == [
+        _generate_network_policy_name("mesh-tester", "kubeflow", p.model_copy(deep=True))
+        for p in policies
+    ]